@@ -1,159 +1,273 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
-import geopandas as gpd
-from shapely.geometry import LineString, Point
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import matplotlib.cm as cm
+from batimetria import abrir_batimetria
+from planta_batimetria import ContornoCacheado, PuntosDecimados
 
 # Ruta del archivo de datos de batimetría y shapefile
 file_path = r"C:\Users\danielal\Downloads\Batimetrias_1997-A-2018_solopuntos.xlsx"
 shapefile_path = r'C://Users//danielal//OneDrive - ITAIPU Binacional//CIH//Proyectos//HIDRO//Modelación Hidromorfologica//RAS-Embalse//Shps//ContornoEmbalse4.shp'
 
-# Cargar el archivo Excel
-df = pd.read_excel(file_path, sheet_name=None)
+# Almacén HDF5 indexado junto al Excel (se genera la primera vez o si el
+# Excel cambió); cada año se lee recién cuando se grafica
+store_path = None  # None = mismo nombre que el Excel con extensión .h5
 
-# Cargar el shapefile usando geopandas
-gdf = gpd.read_file(shapefile_path)
+# Contorno del embalse simplificado una vez (cacheado en un .npz junto al
+# shapefile) y puntos en planta limitados por vista según el zoom
+tolerancia_contorno = 10.0  # m; 0 = sin simplificar
+max_puntos_planta = 50000  # puntos por año dibujados en la vista actual
+puntos_planta = []
 
-# Establecer estilo de gráficos (opcional)
-sns.set(style="whitegrid")
+# La carga de datos y el cálculo de talweg/perfiles corren en un hilo de
+# fondo (uno solo: el almacén h5py no se comparte entre hilos); los
+# resultados vuelven al hilo de Tk con root.after
+ejecutor = ThreadPoolExecutor(max_workers=1)
+intervalo_consulta = 50  # ms entre consultas al hilo de fondo
+df = None
+contorno = None
+year_styles = {}
+# Número de la solicitud de gráfico vigente: al cambiar la selección se
+# incrementa y los cálculos o dibujos en curso de solicitudes anteriores se descartan
+solicitud_actual = 0
 
-# Lista de años disponibles
-years_available = sorted(list(df.keys()), key=int)
 
-# Obtener perfiles disponibles
-all_perfiles = set()
-for year in years_available:
-    if 'Perfil' in df[year].columns:
-        all_perfiles.update(df[year]['Perfil'].dropna().unique())
-all_perfiles = sorted(list(all_perfiles))
+def esperar(futuro, al_terminar, solicitud=None):
+    # Consulta el resultado del hilo de fondo sin bloquear la ventana. Si la
+    # solicitud dejó de ser la vigente, el resultado se descarta.
+    if solicitud is not None and solicitud != solicitud_actual:
+        futuro.cancel()
+        return
+    if not futuro.done():
+        root.after(intervalo_consulta, esperar, futuro, al_terminar, solicitud)
+        return
+    try:
+        resultado = futuro.result()
+    except Exception as e:
+        estado.set(f"Error: {e}")
+        print(f"Error: {e}")
+        return
+    if resultado is not None:
+        al_terminar(resultado)
 
-# Diccionario de tonalidades y marcadores para cada año
-n_years = len(years_available)
-colors = cm.Blues(np.linspace(0.3, 0.9, n_years))
-year_styles = {year: {'color': colors[i], 'marker': ['o', 's', '^', 'd', 'v'][i % 5]}
-               for i, year in enumerate(years_available)}
 
-# Crear la ventana principal de tkinter
-root = tk.Tk()
-root.title("Selección de Años y Perfiles")
-root.geometry("1200x800")
-root.minsize(800, 600)
+# --- Carga inicial (hilo de fondo) ---
+def cargar_datos():
+    almacen = abrir_batimetria(file_path, store_path)
+    return almacen, ContornoCacheado(shapefile_path, tolerancia_contorno)
 
-# Variables para la selección
-selected_years = tk.StringVar(value="2014,2018")
-selected_perfil = tk.StringVar(value="LG-16")
 
-# Crear la figura de Matplotlib
-fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(12, 4), constrained_layout=True)
+def datos_cargados(resultado):
+    global df, contorno, year_styles
+    df, contorno = resultado
+
+    # Lista de años y perfiles disponibles (del índice del almacén, sin leer puntos)
+    years_available = df.anios
+    all_perfiles = df.perfiles
+
+    # Diccionario de tonalidades y marcadores para cada año
+    n_years = len(years_available)
+    colors = cm.Blues(np.linspace(0.3, 0.9, n_years))
+    year_styles = {year: {'color': colors[i], 'marker': ['o', 's', '^', 'd', 'v'][i % 5]}
+                   for i, year in enumerate(years_available)}
+
+    menu = perfil_menu['menu']
+    menu.delete(0, 'end')
+    for perfil in all_perfiles:
+        menu.add_command(label=perfil, command=tk._setit(selected_perfil, perfil))
+    boton_actualizar.config(state=tk.NORMAL)
+    estado.set(f"Datos cargados: {len(years_available)} años, {len(all_perfiles)} perfiles")
+
+
+# --- Preparación de los años seleccionados (hilo de fondo) ---
+def preparar_anios(years, perfil, solicitud):
+    # Lee cada año (si no estaba cargado) y toma su talweg y el perfil
+    # seleccionado de los índices precalculados. Se interrumpe si la
+    # solicitud deja de ser la vigente.
+    resultados = []
+    for year in years:
+        if solicitud != solicitud_actual:
+            return None
+        data = df.get(year)
+        if data is not None and 'Este' in data.columns and 'Norte' in data.columns and 'Cota' in data.columns:
+            resultados.append({'year': year, 'data': data, 'talweg': df.talweg(year),
+                               'perfil': df.perfil(year, perfil)})
+        else:
+            resultados.append({'year': year, 'data': None})
+    return resultados
+
+
+def cancelar_grafico(*args):
+    # Cambio de selección: se descarta cualquier cálculo o dibujo en curso
+    global solicitud_actual
+    solicitud_actual += 1
 
-# Crear el canvas y la barra de herramientas
-canvas = FigureCanvasTkAgg(fig, master=root)
-canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-toolbar = NavigationToolbar2Tk(canvas, root)
-toolbar.update()
-canvas._tkcanvas.pack()
 
 # Función para actualizar el gráfico
 def update_graph():
+    cancelar_grafico()
+    solicitud = solicitud_actual
+    years = [y.strip() for y in selected_years.get().split(",") if y.strip()]
+    perfil = selected_perfil.get()
+    estado.set(f"Calculando {', '.join(years)}...")
+    futuro = ejecutor.submit(preparar_anios, years, perfil, solicitud)
+    esperar(futuro, lambda resultados: plot_data(resultados, perfil, solicitud), solicitud)
+
+
+# Función para graficar los datos y imprimir elevaciones
+def plot_data(resultados, perfil, solicitud):
+    for puntos in puntos_planta:
+        puntos.desconectar()
+    puntos_planta.clear()
     ax1.clear()
     ax2.clear()
     ax3.clear()
-    years = [y.strip() for y in selected_years.get().split(",") if y.strip()]
-    plot_data(years)
 
-# Función para graficar los datos y imprimir elevaciones
-def plot_data(years):
     # Graficar la geometría del shapefile en el primer subgráfico
-    gdf.plot(ax=ax1, color='lightblue', edgecolor='black', alpha=0.5, label='Contorno Embalse')
+    contorno.dibujar(ax1, color='lightblue', edgecolor='black', alpha=0.5, label='Contorno Embalse')
 
-    # Listas para rastrear si se graficó algo en cada eje
-    plotted_ax1 = False
-    plotted_ax2 = False
-    plotted_ax3 = False
+    # Un año por llamada de root.after: la ventana responde entre años y una
+    # nueva selección interrumpe el dibujo
+    plot_year(resultados, 0, perfil, solicitud, {'ax1': False, 'ax2': False, 'ax3': False})
 
-    # Iterar sobre los años seleccionados
-    for year in years:
-        data = df.get(year)
-        if data is not None and 'Este' in data.columns and 'Norte' in data.columns and 'Cota' in data.columns:
-            data = data.sort_values(by='Norte', ascending=True)
-            talweg_data = data.loc[data.groupby('Perfil')['Cota'].idxmin()]
-            talweg_sorted = talweg_data.sort_values(by='Norte', ascending=True)
-
-            # Obtener estilo para el año
-            style = year_styles.get(year, {'color': 'gray', 'marker': 'o'})
-
-            # Graficar en el primer subgráfico (planta)
-            ax1.scatter(data['Este'], data['Norte'], color=style['color'], alpha=0.5,
-                       label=f'Puntos Año {year}', marker=style['marker'], s=10)
-            ax1.scatter(talweg_data['Este'], talweg_data['Norte'], color=style['color'],
-                       label=f'Talweg Año {year}', edgecolor='black', marker=style['marker'], s=50)
-            ax1.plot(talweg_sorted['Este'], talweg_sorted['Norte'], color=style['color'],
-                    label=f'Talweg Continuo {year}', linewidth=2)
-            plotted_ax1 = True
-
-            # Graficar el perfil longitudinal y preparar datos para imprimir
-            talweg_df = talweg_sorted[['Norte', 'Cota']].copy()
-            ax2.plot(talweg_df['Norte'], talweg_df['Cota'], color=style['color'], label=f'Cota Año {year}')
-            plotted_ax2 = True
-
-            # Imprimir las elevaciones del perfil longitudinal
-            print(f"\nElevaciones del perfil longitudinal (Talweg) para el año {year}:")
-            print(talweg_df.to_string(index=False))
-
-            # Graficar la sección transversal del perfil seleccionado
-            perfil = selected_perfil.get()
-            perfil_data = data[data['Perfil'] == perfil]
-            if not perfil_data.empty:
-                perfil_sorted = perfil_data.sort_values(by='Este', ascending=True)
-                ax3.plot(perfil_sorted['Este'], perfil_sorted['Cota'],
-                        label=f'Año {year} - Perfil {perfil}')
-                plotted_ax3 = True
-            else:
-                print(f"El perfil {perfil} no existe en los datos del año {year}.")
+
+def plot_year(resultados, i, perfil, solicitud, plotted):
+    if solicitud != solicitud_actual:
+        return
+    if i == len(resultados):
+        finish_plot(perfil, plotted)
+        return
+
+    resultado = resultados[i]
+    year = resultado['year']
+    if resultado['data'] is not None:
+        data = resultado['data']
+        # Talweg precalculado al cargar el año (ordenado por Norte)
+        talweg_sorted = resultado['talweg']
+        talweg_data = talweg_sorted
+
+        # Obtener estilo para el año
+        style = year_styles.get(year, {'color': 'gray', 'marker': 'o'})
+
+        # Graficar en el primer subgráfico (planta)
+        puntos_planta.append(PuntosDecimados(ax1, data['Este'], data['Norte'], max_puntos_planta,
+                                             color=style['color'], alpha=0.5, label=f'Puntos Año {year}',
+                                             marker=style['marker'], s=10))
+        ax1.scatter(talweg_data['Este'], talweg_data['Norte'], color=style['color'],
+                   label=f'Talweg Año {year}', edgecolor='black', marker=style['marker'], s=50)
+        ax1.plot(talweg_sorted['Este'], talweg_sorted['Norte'], color=style['color'],
+                label=f'Talweg Continuo {year}', linewidth=2)
+        plotted['ax1'] = True
+
+        # Graficar el perfil longitudinal y preparar datos para imprimir
+        talweg_df = talweg_sorted[['Norte', 'Cota']].copy()
+        ax2.plot(talweg_df['Norte'], talweg_df['Cota'], color=style['color'], label=f'Cota Año {year}')
+        plotted['ax2'] = True
+
+        # Imprimir las elevaciones del perfil longitudinal
+        print(f"\nElevaciones del perfil longitudinal (Talweg) para el año {year}:")
+        print(talweg_df.to_string(index=False))
+
+        # Graficar la sección transversal del perfil seleccionado
+        # (filas del perfil por su rango en el índice, ya ordenadas por Este)
+        perfil_sorted = resultado['perfil']
+        if perfil_sorted is not None and not perfil_sorted.empty:
+            ax3.plot(perfil_sorted['Este'], perfil_sorted['Cota'],
+                    label=f'Año {year} - Perfil {perfil}')
+            plotted['ax3'] = True
         else:
-            print(f"Datos no disponibles o columnas faltantes para el año {year}.")
+            print(f"El perfil {perfil} no existe en los datos del año {year}.")
+    else:
+        print(f"Datos no disponibles o columnas faltantes para el año {year}.")
+
+    root.after(0, plot_year, resultados, i + 1, perfil, solicitud, plotted)
 
+
+def finish_plot(perfil, plotted):
     # Configurar los subgráficos con leyendas ajustadas
     ax1.set_xlabel('Coordenada Este')
     ax1.set_ylabel('Coordenada Norte')
     ax1.set_title('Planta General con Talweg')
-    if plotted_ax1:
+    if plotted['ax1']:
         ax1.legend(bbox_to_anchor=(1.05, 1), loc='upper left', borderaxespad=0.)
 
     ax2.set_xlabel('Coordenada Norte')
     ax2.set_ylabel('Cota')
     ax2.set_title('Perfil Longitudinal a lo largo del Talweg')
     ax2.axhline(y=220, color='red', linestyle='--', label='Pelo de Agua (Cota 220)')
-    if plotted_ax2:
+    if plotted['ax2']:
         ax2.legend(bbox_to_anchor=(1.05, 1), loc='upper left', borderaxespad=0.)
 
     ax3.set_xlabel('Coordenada Este (Derecha a Izquierda)')
     ax3.set_ylabel('Cota')
-    ax3.set_title(f'Sección Transversal - Perfil {selected_perfil.get()}')
-    if plotted_ax3:
+    ax3.set_title(f'Sección Transversal - Perfil {perfil}')
+    if plotted['ax3']:
         ax3.legend(bbox_to_anchor=(1.05, 1), loc='upper left', borderaxespad=0.)
 
     # Invertir el eje X del tercer gráfico
     ax3.invert_xaxis()
-    canvas.draw()
+    canvas.draw_idle()
+    estado.set("Listo")
+
+
+def main():
+    global root, selected_years, selected_perfil, estado, fig, ax1, ax2, ax3, canvas, toolbar
+    global perfil_menu, boton_actualizar
+
+    # Establecer estilo de gráficos (opcional)
+    sns.set(style="whitegrid")
+
+    # Crear la ventana principal de tkinter
+    root = tk.Tk()
+    root.title("Selección de Años y Perfiles")
+    root.geometry("1200x800")
+    root.minsize(800, 600)
+
+    # Variables para la selección
+    selected_years = tk.StringVar(value="2014,2018")
+    selected_perfil = tk.StringVar(value="LG-16")
+    estado = tk.StringVar(value="Cargando datos de batimetría...")
+
+    # Crear la figura de Matplotlib
+    fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(12, 4), constrained_layout=True)
+
+    # Crear el canvas y la barra de herramientas
+    canvas = FigureCanvasTkAgg(fig, master=root)
+    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    toolbar = NavigationToolbar2Tk(canvas, root)
+    toolbar.update()
+    canvas._tkcanvas.pack()
+
+    # Crear el campo de entrada para años
+    tk.Label(root, text="Seleccionar Años (separar con coma, ej. 2014,2018):").pack()
+    tk.Entry(root, textvariable=selected_years, width=30).pack()
+
+    # Crear el menú desplegable para perfiles (se completa al terminar la carga)
+    tk.Label(root, text="Seleccionar Perfil:").pack()
+    perfil_menu = tk.OptionMenu(root, selected_perfil, selected_perfil.get())
+    perfil_menu.pack()
+
+    # Botón para actualizar el gráfico (habilitado al terminar la carga)
+    boton_actualizar = tk.Button(root, text="Actualizar Gráfico", command=update_graph, state=tk.DISABLED)
+    boton_actualizar.pack()
+    tk.Label(root, textvariable=estado).pack()
+
+    # Un cambio de selección cancela el gráfico en curso
+    selected_years.trace_add('write', cancelar_grafico)
+    selected_perfil.trace_add('write', cancelar_grafico)
 
-# Crear el campo de entrada para años
-tk.Label(root, text="Seleccionar Años (separar con coma, ej. 2014,2018):").pack()
-tk.Entry(root, textvariable=selected_years, width=30).pack()
+    # Cargar los datos sin bloquear la ventana
+    esperar(ejecutor.submit(cargar_datos), datos_cargados)
 
-# Crear el menú desplegable para perfiles
-tk.Label(root, text="Seleccionar Perfil:").pack()
-perfil_menu = tk.OptionMenu(root, selected_perfil, *all_perfiles)
-perfil_menu.pack()
+    # Hacer la ventana redimensionable
+    root.mainloop()
+    ejecutor.shutdown(wait=False, cancel_futures=True)
 
-# Botón para actualizar el gráfico
-tk.Button(root, text="Actualizar Gráfico", command=update_graph).pack()
+    print("ok")
 
-# Hacer la ventana redimensionable
-root.mainloop()
 
-print("ok")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+import glob
+import os
+import pandas as pd
+from catalogo_hdf import CatalogoHDF
+
+folder = 'C:\\HECtest'
+patron_planes = 'Test.p*.hdf'
+# Catálogo de la estructura de todos los planes; se actualiza solo con los
+# archivos nuevos o modificados
+ruta_catalogo = os.path.join(folder, 'catalogo_hdf.sqlite')
+procesos = None  # None = todos los núcleos
+
+# Consultas de ejemplo sobre el catálogo
+dataset_buscado = 'Results/Unsteady/Output/Output Blocks/Sediment/Sediment Time Series/Cross Sections/Invert Elevation'
+patron_busqueda = '*Sediment*'
+
+
+def main():
+    rutas = glob.glob(os.path.join(folder, patron_planes))
+    with CatalogoHDF(ruta_catalogo) as catalogo:
+        recorridos = catalogo.actualizar(rutas, procesos)
+        quitados = catalogo.quitar_ausentes()
+        print(f"✅ Catálogo actualizado: {recorridos} archivos recorridos, {quitados} quitados "
+              f"({len(rutas)} planes en {folder})")
+
+        with pd.option_context("display.width", 200, "display.max_columns", None, "display.max_colwidth", 80):
+            print(f"\n📂 Planes que contienen {dataset_buscado}:")
+            print(catalogo.planes_con(dataset_buscado).to_string(index=False))
+
+            print(f"\n🔍 Objetos que coinciden con {patron_busqueda}:")
+            print(catalogo.buscar(patron_busqueda).to_string(index=False))
+
+            print("\n📋 Atributos de Plan Data/Plan Information:")
+            print(catalogo.atributos('Plan Data/Plan Information').to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
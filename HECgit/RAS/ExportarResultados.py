@@ -0,0 +1,26 @@
+import glob
+import os
+from archivo_resultados import ArchivoResultados, exportar_resultados
+
+folder = 'C:\\HECtest'
+patron_planes = 'Test.p*.hdf'
+# Archivo con Invert Elevation, Effective Depth, tiempos y resumen de todos
+# los planes; solo se agregan los planes que todavía no están
+ruta_archivo = os.path.join(folder, 'resultados_planes.h5')
+tam_bloque = 1024  # filas de tiempo leídas por vez de cada plan
+
+
+def main():
+    rutas = sorted(glob.glob(os.path.join(folder, patron_planes)))
+    agregados = exportar_resultados(rutas, ruta_archivo, tam_bloque)
+    print(f"✅ {len(agregados)} planes agregados a {ruta_archivo}")
+
+    with ArchivoResultados(ruta_archivo) as archivo:
+        datos = archivo.archivo['invert_elevation']
+        print(f"📦 {len(archivo.planes)} planes, invert_elevation {datos.shape}, chunks {datos.chunks}, "
+              f"compresión {datos.compression or 'blosc'}")
+        print(archivo.resumen())
+
+
+if __name__ == '__main__':
+    main()
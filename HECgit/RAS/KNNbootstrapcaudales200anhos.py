@@ -1,108 +1,87 @@
 import numpy as np
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
-from sklearn.neighbors import NearestNeighbors
-import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
-from pydsstools.heclib.dss import HecDss
-from pydsstools.core import TimeSeriesContainer
+from datetime import datetime
+from knn_bootstrap import construir_tabla_knn, iterar_simulacion, generar_ensamble
+from escritor_series import EscritorSeries, SERIES_DSS
 
-# 1. Cargar los datos desde Excel
 file_path = r'C:\Users\ASUS\OneDrive - ITAIPU Binacional\CIH\Proyectos\HIDRO\Modelación Hidromorfologica\RAS-Embalse\Condiciones de borde del modelo2.xlsx'
-
-try:
-    historical_data = pd.read_excel(file_path)
-except FileNotFoundError:
-    print(f"Error: Excel file not found at {file_path}")
-    exit(1)
-
-# 2. Renombrar columnas
-historical_data = historical_data.rename(columns={
-    'Fecha': 'Date',
-    'Caudal Guaira': 'Flow',
-    'Nivel Usina': 'Level'
-})
-
-# 3. Asegurar formato datetime y limpiar datos
-historical_data['Date'] = pd.to_datetime(historical_data['Date'])
-historical_data = historical_data[['Date', 'Flow', 'Level']].dropna()
-
-# 4. Estandarizar
-scaler = StandardScaler()
-data_scaled = scaler.fit_transform(historical_data[['Flow', 'Level']])
-data_scaled = pd.DataFrame(data_scaled, columns=['Flow', 'Level'], index=historical_data.index)
-
-# 5. Preparar KNN
-data_with_next = data_scaled[:-1].copy()
-data_with_next['Next_Flow'] = data_scaled['Flow'][1:].values
-data_with_next['Next_Level'] = data_scaled['Level'][1:].values
-
-k = 5
-knn = NearestNeighbors(n_neighbors=k)
-knn.fit(data_with_next[['Flow', 'Level']])
-
-# 6. Generar serie sintética
-start_date = datetime.strptime('2019-01-01', '%Y-%m-%d')
-end_date = datetime.strptime('2419-12-31', '%Y-%m-%d')
-synthetic_dates = [start_date + timedelta(days=x) for x in range((end_date - start_date).days + 1)]
-n_synthetic = len(synthetic_dates)
-
-current_point = data_scaled.iloc[-1][['Flow', 'Level']].values
-synthetic_series = []
-
-for _ in range(n_synthetic):
-    distances, indices = knn.kneighbors([current_point])
-    weights = 1 / (distances[0] + 1e-10)
-    weights /= weights.sum()
-    chosen_index = np.random.choice(indices[0], p=weights)
-    next_point = data_with_next.iloc[chosen_index][['Next_Flow', 'Next_Level']].values
-    synthetic_series.append(next_point)
-    current_point = next_point
-
-# 7. Invertir la estandarización
-synthetic_series = np.array(synthetic_series)
-synthetic_series = scaler.inverse_transform(synthetic_series)
-synthetic_df = pd.DataFrame({
-    'Date': synthetic_dates,
-    'Flow': synthetic_series[:, 0],
-    'Level': synthetic_series[:, 1]
-})
-
-# 8. Guardar como CSV
 output_csv = r'C:\Users\ASUS\OneDrive - ITAIPU Binacional\CIH\Proyectos\HIDRO\Modelación Hidromorfologica\RAS-Embalse\synthetic_flow_level_2019_to_2419.csv'
-synthetic_df.to_csv(output_csv, index=False)
-print(f"Datos sintéticos guardados en '{output_csv}'")
-
-# 9. Guardar en archivo DSS como serie regular
 output_dss = r'C:\Users\ASUS\OneDrive - ITAIPU Binacional\CIH\Proyectos\HIDRO\Modelación Hidromorfologica\RAS-Embalse\synthetic_flow_level_2019_to_2419.dss'
-
-try:
-    with HecDss.Open(output_dss) as dss:
-        start_str = synthetic_df['Date'].iloc[0].strftime('%d%b%Y %H:%M').upper()
-
-        # Guardar Flow
-        flow_container = TimeSeriesContainer()
-        flow_container.pathname = "/ITAIPU/GUAIRA/FLOW//1DAY/SYNTHETIC/"
-        flow_container.startDateTime = start_str
-        flow_container.interval = 1
-        flow_container.values = synthetic_df['Flow'].values.tolist()
-        flow_container.numberValues = len(flow_container.values)
-        flow_container.units = "CMS"
-        flow_container.type = "INST"
-        dss.put_ts(flow_container)
-        print(f"Escrita serie de caudal en DSS: {flow_container.pathname}")
-
-        # Guardar Level
-        level_container = TimeSeriesContainer()
-        level_container.pathname = "/ITAIPU/USINA/STAGE//1DAY/SYNTHETIC/"
-        level_container.startDateTime = start_str
-        level_container.interval = 1
-        level_container.values = synthetic_df['Level'].values.tolist()
-        level_container.numberValues = len(level_container.values)
-        level_container.units = "M"
-        level_container.type = "INST"
-        dss.put_ts(level_container)
-        print(f"Escrita serie de nivel en DSS: {level_container.pathname}")
-
-except Exception as e:
-    print(f"Error al guardar archivo DSS: {e}")
\ No newline at end of file
+output_ensamble = r'C:\Users\ASUS\OneDrive - ITAIPU Binacional\CIH\Proyectos\HIDRO\Modelación Hidromorfologica\RAS-Embalse\synthetic_flow_level_2019_to_2419_ensamble.npy'
+
+# Modo ensamble: con n_realizaciones > 1 se generan trazas independientes en
+# paralelo (una por proceso) y se guardan como array (realización x día x variable).
+# La semilla fija hace reproducible la corrida; None usa entropía del sistema.
+n_realizaciones = 1
+semilla = None
+procesos = None  # None = todos los núcleos
+# Días por bloque de escritura: la memoria no depende del largo de la serie
+tam_bloque = 3650
+
+
+def main():
+    # 1. Cargar los datos desde Excel
+    try:
+        historical_data = pd.read_excel(file_path)
+    except FileNotFoundError:
+        print(f"Error: Excel file not found at {file_path}")
+        return
+
+    # 2. Renombrar columnas
+    historical_data = historical_data.rename(columns={
+        'Fecha': 'Date',
+        'Caudal Guaira': 'Flow',
+        'Nivel Usina': 'Level'
+    })
+
+    # 3. Asegurar formato datetime y limpiar datos
+    historical_data['Date'] = pd.to_datetime(historical_data['Date'])
+    historical_data = historical_data[['Date', 'Flow', 'Level']].dropna()
+
+    # 4. Estandarizar
+    scaler = StandardScaler()
+    data_scaled = scaler.fit_transform(historical_data[['Flow', 'Level']])
+    data_scaled = pd.DataFrame(data_scaled, columns=['Flow', 'Level'], index=historical_data.index)
+
+    # 5. Preparar KNN (vecinos y pesos de todos los estados históricos, una sola vez)
+    k = 5
+    indices_knn, pesos_acum = construir_tabla_knn(data_scaled[['Flow', 'Level']].values, k=k)
+
+    # 6. Generar serie sintética
+    start_date = datetime.strptime('2019-01-01', '%Y-%m-%d')
+    end_date = datetime.strptime('2419-12-31', '%Y-%m-%d')
+    n_synthetic = (end_date - start_date).days + 1
+    valores_historicos = historical_data[['Flow', 'Level']].values
+
+    if n_realizaciones > 1:
+        ensamble = generar_ensamble(indices_knn, pesos_acum, valores_historicos, n_realizaciones,
+                                    n_synthetic, semilla=semilla, procesos=procesos)
+        np.save(output_ensamble, ensamble)
+        print(f"Ensamble {ensamble.shape} guardado en '{output_ensamble}'")
+        # La primera realización se exporta también a CSV y DSS
+        bloques = (ensamble[0, i:i + tam_bloque] for i in range(0, n_synthetic, tam_bloque))
+    else:
+        # Partiendo del último día histórico, cada paso salta al sucesor de un vecino.
+        # 7. Los índices se traducen a los valores originales (equivale a invertir
+        # la estandarización) bloque a bloque, a medida que se generan.
+        rng = np.random.default_rng(semilla)
+        bloques = (valores_historicos[estados] for estados in
+                   iterar_simulacion(indices_knn, pesos_acum, n_synthetic, tam_bloque, rng=rng))
+
+    # 8-9. Guardar como CSV y como serie regular en DSS, bloque a bloque
+    try:
+        with EscritorSeries(output_csv, output_dss, start_date) as escritor:
+            for bloque in bloques:
+                escritor.escribir(bloque[:, 0], bloque[:, 1])
+    except Exception as e:
+        print(f"Error al guardar series sintéticas: {e}")
+        return
+
+    print(f"Datos sintéticos guardados en '{output_csv}'")
+    for _, pathname, _ in SERIES_DSS:
+        print(f"Escrita serie en DSS: {pathname}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,9 @@
-import h5py
 import numpy as np
 import pandas as pd
 import os
 import matplotlib.pyplot as plt
+from cache_planes import CachePlanes
+from metricas import puntuar_perfiles, tabla_metricas, curvas_errores
 
 # Ruta de archivos HDF
 hdf_files = [
@@ -10,6 +11,9 @@ hdf_files = [
     for num in range(35, 55)  # 53 porque el límite superior no se incluye
 ]
 
+# Cache de datos extraídos: los planes sin cambios no se vuelven a abrir
+ruta_cache = r"C:\HECtest\cache_planes.sqlite"
+
 # Nombres amigables para métodos de transporte
 nombres_metodos = {
     "Test.p33.hdf": "Meyer-Peter Müller",
@@ -23,66 +27,116 @@ observed_2018 = np.array([
     85.25, 82.26, 78.73, 64.64, 61.55, 76.38, 56.26, 67.76
 ])
 
-# Lista para resultados
-results = []
-simulated_profiles = {}
-
-for file_path in hdf_files:
-    file_name = os.path.basename(file_path)
-    metodo = nombres_metodos.get(file_name, file_name)
-
-    try:
-        with h5py.File(file_path, 'r') as f:
-            invert_data = f['Results']['Unsteady']['Output']['Output Blocks']['Sediment']\
-                ['Sediment Time Series']['Cross Sections']['Invert Elevation']
-            last_sim = invert_data[-1]
-    except Exception as e:
-        print(f"⚠️ Error al procesar {file_path}: {e}")
-        continue
-
-    if len(last_sim) != len(observed_2018):
-        print(f"⚠️ Tamaño incompatible en {file_path}: {len(last_sim)} vs {len(observed_2018)}")
-        continue
-
-    rmse = np.sqrt(np.mean((last_sim - observed_2018) ** 2))
-    corr = np.corrcoef(last_sim, observed_2018)[0, 1]
-
-    results.append({
-        "Método": metodo,
-        "RMSE": round(rmse, 3),
-        "Correlación (r)": round(corr, 3)
-    })
-
-    # Guardar perfil para graficar
-    simulated_profiles[metodo] = last_sim
-
-# Crear tabla ordenada por RMSE
-df = pd.DataFrame(results)
-df_sorted = df.sort_values(by="RMSE")
-
-# Mostrar tabla
-print("\n📊 Resultados comparativos:")
-print(df_sorted.to_string(index=False))
-
-# Guardar en Excel
-df_sorted.to_excel("comparacion_metodos_sedimentos.xlsx", index=False)
-
-# 🔹 Gráfico de perfiles longitudinales
-plt.figure(figsize=(10, 6))
-x = np.arange(len(observed_2018))
-
-# Perfil observado
-plt.plot(x, observed_2018, 'k--', label="Observado (2018)", linewidth=2)
-
-# Perfiles simulados
-for metodo, perfil in simulated_profiles.items():
-    plt.plot(x, perfil, label=metodo)
-
-plt.xlabel("Sección transversal")
-plt.ylabel("Elevación del lecho (m)")
-plt.title("Comparación de Perfiles Longitudinales")
-plt.legend()
-plt.grid(True)
-plt.gca().invert_xaxis()  # 👈 Esta línea invierte el eje X
-plt.tight_layout()
-plt.show()
+# Levantamientos observados por año (mismas 16 secciones). Se puntúa contra
+# los años de anios_puntuados; None = todos los disponibles.
+perfiles_observados = {
+    2018: observed_2018,
+}
+anios_puntuados = None
+
+# Modo historial: además del último paso, puntuar cada paso de tiempo guardado
+# contra el levantamiento más cercano (lectura por bloques del eje temporal)
+modo_historial = False
+
+
+def main():
+    # Perfiles simulados a puntuar
+    simulated_profiles = {}
+
+    # Perfil final (último paso de tiempo) de cada plan, desde el cache si no cambió
+    with CachePlanes(ruta_cache) as cache:
+        datos_planes = cache.obtener_varios(hdf_files)
+
+    for file_path, datos in zip(hdf_files, datos_planes):
+        file_name = os.path.basename(file_path)
+        metodo = nombres_metodos.get(file_name, file_name)
+
+        if datos is None or datos['invert_final'] is None:
+            print(f"⚠️ Error al procesar {file_path}: sin perfil de Invert Elevation")
+            continue
+        last_sim = datos['invert_final']
+
+        if len(last_sim) != len(observed_2018):
+            print(f"⚠️ Tamaño incompatible en {file_path}: {len(last_sim)} vs {len(observed_2018)}")
+            continue
+
+        # Guardar perfil para puntuar y graficar
+        simulated_profiles[metodo] = last_sim
+
+    if not simulated_profiles:
+        print("⚠️ Ningún plan con perfil válido")
+        return
+
+    # Matriz (planes x secciones) y todas las métricas en una sola pasada
+    anios = sorted(perfiles_observados) if anios_puntuados is None else anios_puntuados
+    simulados = np.vstack(list(simulated_profiles.values()))
+    observados = np.vstack([perfiles_observados[a] for a in anios])
+    metricas = puntuar_perfiles(simulados, observados)
+
+    # Crear tabla ordenada por RMSE (dentro de cada año observado)
+    df = tabla_metricas(simulated_profiles.keys(), anios, metricas).round(3)
+    df = df.rename(columns={"r": "Correlación (r)"})
+    df_sorted = df.sort_values(by=["Año observado", "RMSE"])
+
+    # Mostrar tabla
+    print("\n📊 Resultados comparativos:")
+    print(df_sorted.to_string(index=False))
+
+    # Guardar en Excel
+    df_sorted.to_excel("comparacion_metodos_sedimentos.xlsx", index=False)
+
+    # 🔹 Gráfico de perfiles longitudinales
+    plt.figure(figsize=(10, 6))
+    x = np.arange(len(observed_2018))
+
+    # Perfil observado
+    plt.plot(x, observed_2018, 'k--', label="Observado (2018)", linewidth=2)
+
+    # Perfiles simulados
+    for metodo, perfil in simulated_profiles.items():
+        plt.plot(x, perfil, label=metodo)
+
+    plt.xlabel("Sección transversal")
+    plt.ylabel("Elevación del lecho (m)")
+    plt.title("Comparación de Perfiles Longitudinales")
+    plt.legend()
+    plt.grid(True)
+    plt.gca().invert_xaxis()  # 👈 Esta línea invierte el eje X
+    plt.tight_layout()
+
+    if modo_historial:
+        graficar_historial()
+
+    plt.show()
+
+
+def graficar_historial():
+    levantamientos = {a: perfiles_observados[a] for a in
+                      (sorted(perfiles_observados) if anios_puntuados is None else anios_puntuados)}
+    rutas = [r for r in hdf_files if os.path.exists(r)]
+    curvas = curvas_errores(rutas, levantamientos)
+    if not curvas:
+        print("⚠️ Ningún plan pudo puntuarse a lo largo del tiempo")
+        return
+
+    # Tabla larga (plan x paso de tiempo) en Excel
+    tablas = []
+    for ruta, curva in curvas.items():
+        file_name = os.path.basename(ruta)
+        tablas.append(curva.assign(Método=nombres_metodos.get(file_name, file_name)))
+    pd.concat(tablas).to_excel("curvas_error_temporal.xlsx", index=False)
+
+    # 🔹 Curva de RMSE en el tiempo por plan
+    plt.figure(figsize=(10, 6))
+    for tabla in tablas:
+        plt.plot(tabla['Fecha'], tabla['RMSE'], label=tabla['Método'].iloc[0])
+    plt.xlabel("Fecha")
+    plt.ylabel("RMSE contra el levantamiento más cercano (m)")
+    plt.title("Error del perfil del lecho a lo largo de la simulación")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+import pandas as pd
+from batimetria import abrir_batimetria
+from volumenes_batimetria import cambios_volumen
+
+# Ruta del archivo de datos de batimetría (se usa el almacén .h5 generado a partir de él)
+file_path = r"C:\Users\danielal\Downloads\Batimetrias_1997-A-2018_solopuntos.xlsx"
+store_path = None  # None = mismo nombre que el Excel con extensión .h5
+
+pares = None  # None = todos los pares de años, o p.ej. [(1997, 2018), (2014, 2018)]
+n_estaciones = 200  # puntos de la grilla común de cada sección
+procesos = None  # None = todos los núcleos
+output_excel = 'volumenes_batimetria.xlsx'
+
+
+def main():
+    with abrir_batimetria(file_path, store_path) as almacen:
+        ruta_almacen = almacen.ruta
+
+    # Depósito y erosión entre cada par de levantamientos, en paralelo
+    resumen, tablas = cambios_volumen(ruta_almacen, pares, n_estaciones, procesos)
+
+    with pd.option_context("display.float_format", "{:,.0f}".format, "display.width", 200,
+                           "display.max_columns", None):
+        print(resumen)
+
+    # Resumen y detalle por sección de cada par en hojas separadas
+    with pd.ExcelWriter(output_excel) as writer:
+        resumen.to_excel(writer, sheet_name='Resumen', index=False)
+        for (anio_a, anio_b), tabla in tablas.items():
+            tabla.to_excel(writer, sheet_name=f'{anio_a}-{anio_b}', index=False)
+    print(f"\n✓ Volúmenes guardados en {output_excel}")
+
+
+if __name__ == '__main__':
+    main()
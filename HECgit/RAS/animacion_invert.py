@@ -0,0 +1,207 @@
+#renderizado de frames de la animacion de elevacion del invert en paralelo
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.legend import Legend
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from instrumentacion import medido
+from muestreo_tiempos import anios
+
+
+def planificar_frames(indices, tiempos, textos=None):
+    # Estado de cada frame, calculado de antemano para que los frames sean
+    # independientes entre sí: índice de datos, título y líneas de año
+    # acumuladas hasta ese frame como [(año, índice de datos)].
+    # tiempos: índice datetime64 completo; textos: {índice: marca original}
+    # para el título (por defecto la fecha ISO).
+    indices = np.asarray(indices, dtype=int)
+    anios_frames = anios(tiempos[indices])
+    frames = []
+    year_lines = []
+    for frame, (data_index, current_year) in enumerate(zip(indices.tolist(), anios_frames.tolist())):
+        if frame > 0 and current_year != anios_frames[frame - 1]:
+            year_lines.append((int(anios_frames[frame - 1]), data_index))
+        lineas = list(year_lines)
+        # En el último frame, registrar la línea para el año actual
+        if frame == len(indices) - 1:
+            lineas.append((current_year, data_index))
+        texto = textos[data_index] if textos is not None else str(tiempos[data_index]).replace('T', ' ')
+        frames.append({'data_index': data_index, 'time': texto, 'year_lines': lineas})
+    return frames
+
+
+@medido('render.figura')
+def crear_figura(contexto, fig=None):
+    # Figura con los elementos estáticos del gráfico; por defecto una figura
+    # Agg propia, independiente de pyplot
+    if fig is None:
+        fig = Figure(figsize=(12, 8), dpi=contexto['dpi'])
+        FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.set_ylabel('Elevación del Invert (m)')
+    ax.grid(True)
+    ax.invert_xaxis()
+    ax.set_xticks([])
+
+    initial = contexto['perfiles'][0]
+    ax.plot(contexto['observado'], label=contexto['label_observado'], color='black', linestyle=':',
+            marker='o', linewidth=2)
+    ax.plot(range(len(initial)), initial, label='Paso Inicial', color='gray', linestyle='--', linewidth=1)
+
+    # Presa referencial en el lado derecho (trapezoidal)
+    n_sections = len(initial)
+    presa_x = [n_sections, n_sections - 0.20, n_sections - 0.30, n_sections - 0.5]
+    presa_y = [50, 225, 225, 50]
+    ax.fill(presa_x, presa_y, color='gray', alpha=0.5, label='Presa Referencial')
+    return fig, ax
+
+
+@medido('render.frame')
+def dibujar_frame(fig, ax, contexto, estado):
+    # Dibuja los elementos del frame, rasteriza y los quita. Devuelve RGB (alto x ancho x 3)
+    perfiles = contexto['perfiles']
+    data = perfiles[estado['data_index']]
+    x = range(len(data))
+    artistas = ax.plot(x, data, label=contexto['label'], color=contexto['color'], linestyle='-', marker='o')
+    artistas.append(ax.fill_between(x, perfiles[0], data, color='brown', alpha=0.3, label='Depósito/Erosión'))
+    for year, data_index in estado['year_lines']:
+        artistas += ax.plot(x, perfiles[data_index], linestyle='-', linewidth=1, alpha=0.5, label=f'Año {year}')
+    ax.set_title(f"Cambio de Elevación del Invert - {estado['time']}")
+    leyenda = ax.legend()
+
+    fig.canvas.draw()
+    rgb = np.asarray(fig.canvas.buffer_rgba())[..., :3].copy()
+
+    leyenda.remove()
+    for artista in artistas:
+        artista.remove()
+    ax.set_prop_cycle(None)
+    return rgb
+
+
+# Figura de cada proceso del pool, creada una sola vez por proceso
+_figura_worker = None
+
+
+def _iniciar_worker(contexto):
+    global _figura_worker
+    fig, ax = crear_figura(contexto)
+    _figura_worker = (fig, ax, contexto)
+
+
+def _renderizar(estado):
+    fig, ax, contexto = _figura_worker
+    return dibujar_frame(fig, ax, contexto, estado)
+
+
+def renderizar_frames(contexto, frames, procesos=None):
+    # Rasteriza los frames en procesos paralelos y los entrega en orden
+    if procesos == 1:
+        _iniciar_worker(contexto)
+        for estado in frames:
+            yield _renderizar(estado)
+        return
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_worker,
+                             initargs=(contexto,)) as pool:
+        yield from pool.map(_renderizar, frames)
+
+
+def _vertices_relleno(x, y0, y1):
+    # Contorno cerrado entre y0 e y1 (lo mismo que dibuja fill_between)
+    x = np.asarray(x, dtype=float)
+    return np.concatenate([np.column_stack([x, y0]), np.column_stack([x[::-1], np.asarray(y1)[::-1]])])
+
+
+class AnimacionBlit:
+    # Animación incremental: los elementos estáticos (observado, paso inicial,
+    # presa y leyenda) se rasterizan una vez como fondo y en cada frame solo
+    # se actualizan los datos de la línea, los vértices del relleno y la
+    # visibilidad de las líneas de año. El costo por frame es constante.
+    def __init__(self, contexto, frames, fig=None):
+        self.contexto = contexto
+        self.frames = frames
+        self.fig, self.ax = crear_figura(contexto, fig)
+        self.ax.set_title('Cambio de Elevación del Invert a lo Largo del Tiempo - Guairá A-A')
+
+        perfiles = contexto['perfiles']
+        self.x = np.arange(len(perfiles[0]))
+        self.line, = self.ax.plot(self.x, perfiles[0], label=contexto['label'], color=contexto['color'],
+                                  linestyle='-', marker='o', animated=True)
+        self.fill = self.ax.fill_between(self.x, perfiles[0], perfiles[0], color='brown', alpha=0.3,
+                                         label='Depósito/Erosión', animated=True)
+        self.texto = self.ax.text(0.08, 0.97, '', transform=self.ax.transAxes, va='top', animated=True)
+        # Leyenda fija solo con los elementos creados hasta aquí
+        manijas_fijas, etiquetas_fijas = self.ax.get_legend_handles_labels()
+
+        # Todas las líneas de año que aparecerán, creadas ocultas de antemano,
+        # con su propia leyenda animada: como las líneas se acumulan en orden,
+        # las entradas visibles siempre son las primeras de la leyenda
+        self.year_lines = {}
+        for year, data_index in (frames[-1]['year_lines'] if frames else []):
+            linea, = self.ax.plot(self.x, perfiles[data_index], linestyle='-', linewidth=1, alpha=0.5,
+                                  label=f'Año {year}', visible=False, animated=True)
+            self.year_lines[(year, data_index)] = linea
+        self.leyenda_anios = None
+        if self.year_lines:
+            lineas = list(self.year_lines.values())
+            self.leyenda_anios = Legend(self.ax, lineas, [l.get_label() for l in lineas], loc='lower right',
+                                        ncol=1 + len(lineas) // 12, fontsize='small', frameon=False)
+            self.leyenda_anios.set_animated(True)
+            self.ax.add_artist(self.leyenda_anios)
+            manijas = getattr(self.leyenda_anios, 'legend_handles', None) or self.leyenda_anios.legendHandles
+            self.entradas_anios = dict(zip(self.year_lines, zip(manijas, self.leyenda_anios.get_texts())))
+
+        # Límites fijos que abarcan todos los frames (el fondo no se redibuja)
+        todos = np.vstack(list(perfiles.values()))
+        abajo, arriba = self.ax.get_ylim()
+        self.ax.set_ylim(min(abajo, todos.min()), max(arriba, todos.max()))
+
+        self.ax.legend(manijas_fijas, etiquetas_fijas, loc='upper right')
+        self.fondo = None
+        self.fig.canvas.mpl_connect('draw_event', self._guardar_fondo)
+
+    def _guardar_fondo(self, event=None):
+        self.fondo = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+
+    def artistas(self):
+        artistas = [self.fill, self.line, self.texto] + list(self.year_lines.values())
+        if self.leyenda_anios is not None:
+            artistas.append(self.leyenda_anios)
+        return artistas
+
+    def actualizar(self, frame):
+        estado = self.frames[frame]
+        perfiles = self.contexto['perfiles']
+        data = perfiles[estado['data_index']]
+        self.line.set_ydata(data)
+        self.fill.set_verts([_vertices_relleno(self.x, perfiles[0], data)])
+        self.texto.set_text(estado['time'])
+        visibles = set(estado['year_lines'])
+        for clave, linea in self.year_lines.items():
+            linea.set_visible(clave in visibles)
+            for entrada in self.entradas_anios[clave]:
+                entrada.set_visible(clave in visibles)
+        return self.artistas()
+
+    @medido('render.blit')
+    def rasterizar(self, frame):
+        # Restaura el fondo cacheado y dibuja solo los artistas dinámicos
+        canvas = self.fig.canvas
+        if self.fondo is None:
+            canvas.draw()
+        canvas.restore_region(self.fondo)
+        for artista in self.actualizar(frame):
+            if artista.get_visible():
+                self.ax.draw_artist(artista)
+        return np.asarray(canvas.buffer_rgba())[..., :3].copy()
+
+    def iterar(self):
+        for frame in range(len(self.frames)):
+            yield self.rasterizar(frame)
+
+    def funcanimation(self, interval=1000):
+        # Para visualizar en pantalla con blit=True
+        from matplotlib.animation import FuncAnimation
+        return FuncAnimation(self.fig, self.actualizar, frames=len(self.frames), blit=True, interval=interval)
@@ -0,0 +1,179 @@
+#archivo HDF5 comprimido y fragmentado con los resultados de varios planes (dimension plan)
+import os
+
+import h5py
+import numpy as np
+import pandas as pd
+
+from hdf_plan import PlanHDF, decodificar
+
+try:
+    import hdf5plugin
+except ImportError:
+    hdf5plugin = None
+
+# Variable del archivo -> propiedad de PlanHDF con la serie (tiempo x sección)
+VARIABLES = {
+    'invert_elevation': 'invert_elevation',
+    'effective_depth': 'effective_depth',
+}
+
+# Tamaño objetivo de cada chunk sin comprimir. Los chunks (1 plan, tiempos,
+# secciones) cubren la misma fracción de ambos ejes, así leer un instante o la
+# serie de una sección toca la misma (pequeña) cantidad de chunks.
+BYTES_CHUNK = 256 * 1024
+TAM_BLOQUE = 1024  # filas de tiempo copiadas por lectura del plan original
+SIN_TIEMPO = np.iinfo(np.int64).min
+
+
+def compresion():
+    # Blosc/zstd con bitshuffle si está hdf5plugin; si no, gzip + shuffle (siempre disponible en h5py)
+    if hdf5plugin is not None:
+        return dict(hdf5plugin.Blosc(cname='zstd', clevel=5, shuffle=hdf5plugin.Blosc.BITSHUFFLE))
+    return {'compression': 'gzip', 'compression_opts': 4, 'shuffle': True}
+
+
+def chunks_tiempo_seccion(n_tiempos, n_secciones, tam_item, bytes_chunk=BYTES_CHUNK):
+    # tiempos / n_tiempos = secciones / n_secciones con tiempos * secciones = elementos
+    elementos = max(1, bytes_chunk // tam_item)
+    secciones = int(np.sqrt(elementos * max(n_secciones, 1) / max(n_tiempos, 1)))
+    secciones = max(1, min(n_secciones, secciones))
+    tiempos = max(1, min(n_tiempos, elementos // secciones))
+    return 1, tiempos, secciones
+
+
+def nombre_plan(ruta):
+    return os.path.splitext(os.path.basename(ruta))[0]
+
+
+class ArchivoResultados:
+    # Archivo con dimensión plan: /planes (nombres), /n_tiempos, /tiempos
+    # (segundos desde 1970, plan x tiempo), una serie plan x tiempo x sección
+    # por cada variable de VARIABLES y /resumen/<atributo> (texto por plan).
+    # Los planes con menos tiempos o secciones quedan rellenos con NaN.
+    def __init__(self, ruta, modo='r'):
+        self.ruta = ruta
+        self.archivo = h5py.File(ruta, modo)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self):
+        self.archivo.close()
+
+    @property
+    def planes(self):
+        if 'planes' not in self.archivo:
+            return []
+        return [decodificar(p) for p in self.archivo['planes'][()]]
+
+    def indice(self, plan):
+        return plan if isinstance(plan, (int, np.integer)) else self.planes.index(plan)
+
+    def n_tiempos(self, plan):
+        return int(self.archivo['n_tiempos'][self.indice(plan)])
+
+    def tiempos(self, plan):
+        i = self.indice(plan)
+        return self.archivo['tiempos'][i, :self.n_tiempos(i)].astype('datetime64[s]')
+
+    def serie(self, variable, seccion, planes=slice(None)):
+        # Serie temporal de una sección para los planes pedidos (plan x tiempo)
+        return self.archivo[variable][planes, :, seccion]
+
+    def perfil(self, variable, plan, tiempo):
+        # Valores de todas las secciones en un instante de un plan
+        return self.archivo[variable][self.indice(plan), tiempo, :]
+
+    def resumen(self):
+        # Atributos del resumen de cada plan (filas = planes)
+        grupo = self.archivo['resumen']
+        return pd.DataFrame({clave: [decodificar(v) for v in grupo[clave][()]] for clave in grupo},
+                            index=self.planes)
+
+    # --- Escritura ---
+    def _crear(self, n_tiempos, n_secciones):
+        opciones = compresion()
+        cadena = h5py.string_dtype()
+        self.archivo.create_dataset('planes', (0,), dtype=cadena, maxshape=(None,))
+        self.archivo.create_dataset('n_tiempos', (0,), dtype='i8', maxshape=(None,))
+        self.archivo.create_dataset('tiempos', (0, n_tiempos), dtype='i8', maxshape=(None, None),
+                                    chunks=(1, min(max(n_tiempos, 1), BYTES_CHUNK // 8)),
+                                    fillvalue=SIN_TIEMPO, **opciones)
+        self.archivo['tiempos'].attrs['unidades'] = 'segundos desde 1970-01-01'
+        for variable in VARIABLES:
+            self.archivo.create_dataset(variable, (0, n_tiempos, n_secciones), dtype='f4',
+                                        maxshape=(None, None, None),
+                                        chunks=chunks_tiempo_seccion(n_tiempos, n_secciones, 4),
+                                        fillvalue=np.nan, **opciones)
+        self.archivo.create_group('resumen')
+
+    def _ampliar(self, n_tiempos, n_secciones):
+        n_planes = len(self.archivo['planes']) + 1
+        self._recortar(n_planes)
+        tiempos = self.archivo['tiempos']
+        tiempos.resize((n_planes, max(tiempos.shape[1], n_tiempos)))
+        for variable in VARIABLES:
+            datos = self.archivo[variable]
+            datos.resize((n_planes, max(datos.shape[1], n_tiempos), max(datos.shape[2], n_secciones)))
+        return n_planes - 1
+
+    def _recortar(self, n_planes):
+        # Ajusta el eje de planes de todos los datasets a n_planes
+        for nombre in ('planes', 'n_tiempos', 'tiempos', *VARIABLES):
+            datos = self.archivo[nombre]
+            datos.resize((n_planes,) + datos.shape[1:])
+        for clave in self.archivo['resumen']:
+            self.archivo['resumen'][clave].resize((n_planes,))
+
+    def agregar(self, ruta, tam_bloque=TAM_BLOQUE):
+        # Copia los resultados de un plan por bloques de tiempo (memoria acotada)
+        with PlanHDF(ruta) as plan:
+            n_tiempos, n_secciones = plan.invert_elevation.shape
+            if 'planes' not in self.archivo:
+                self._crear(n_tiempos, n_secciones)
+            i = self._ampliar(n_tiempos, n_secciones)
+            try:
+                self._copiar(plan, i, tam_bloque)
+            except Exception:
+                # No dejar un plan a medio copiar
+                self._recortar(i)
+                raise
+            self.archivo['planes'][i] = nombre_plan(ruta)
+
+    def _copiar(self, plan, i, tam_bloque):
+        n_tiempos, n_secciones = plan.invert_elevation.shape
+        self.archivo['n_tiempos'][i] = n_tiempos
+        for desde in range(0, n_tiempos, tam_bloque):
+            hasta = min(desde + tam_bloque, n_tiempos)
+            self.archivo['tiempos'][i, desde:hasta] = plan.tiempos(slice(desde, hasta)).astype(np.int64)
+            for variable, propiedad in VARIABLES.items():
+                self.archivo[variable][i, desde:hasta, :n_secciones] = getattr(plan, propiedad)[desde:hasta]
+
+        resumen = self.archivo['resumen']
+        for clave, valor in plan.resumen().items():
+            if clave not in resumen:
+                resumen.create_dataset(clave, (len(self.archivo['planes']),),
+                                       dtype=h5py.string_dtype(), maxshape=(None,))
+            resumen[clave][i] = str(valor)
+
+
+def exportar_resultados(rutas, ruta_archivo, tam_bloque=TAM_BLOQUE):
+    # Agrega al archivo los planes que todavía no están (por nombre).
+    # Devuelve los nombres de los planes agregados.
+    agregados = []
+    with ArchivoResultados(ruta_archivo, 'a') as archivo:
+        existentes = set(archivo.planes)
+        for ruta in rutas:
+            if nombre_plan(ruta) in existentes:
+                continue
+            try:
+                archivo.agregar(ruta, tam_bloque)
+            except Exception as e:
+                print(f"❌ Error en archivo {ruta}: {e}")
+                continue
+            agregados.append(nombre_plan(ruta))
+    return agregados
@@ -0,0 +1,146 @@
+#almacen indexado de levantamientos batimetricos (HDF5 por año y Perfil)
+import os
+
+import h5py
+import numpy as np
+import pandas as pd
+
+COORDENADAS = ('Este', 'Norte', 'Cota')
+# Coordenadas guardadas como desplazamiento float32 desde un origen
+ORIGEN = ('Este', 'Norte')
+
+
+def convertir_excel(ruta_excel, ruta_almacen):
+    # Lee una sola vez todas las hojas (una por año) del Excel de batimetrías
+    # y las escribe en un HDF5: un grupo por año con las filas ordenadas por
+    # Perfil, el Perfil como código entero de una lista común y las
+    # coordenadas en float32. Este y Norte (UTM, ~1e6 m) se guardan como
+    # desplazamiento desde un origen por año para no perder precisión.
+    hojas = pd.read_excel(ruta_excel, sheet_name=None)
+    anios = sorted((str(a) for a in hojas), key=int)
+    perfiles = sorted({p for hoja in hojas.values() if 'Perfil' in hoja.columns
+                       for p in hoja['Perfil'].dropna().astype(str).unique()})
+
+    with h5py.File(ruta_almacen, 'w') as archivo:
+        archivo.create_dataset('perfiles', data=np.array(perfiles, dtype=h5py.string_dtype()))
+        for anio in anios:
+            hoja = hojas[anio] if anio in hojas else hojas[int(anio)]
+            if not set(COORDENADAS).issubset(hoja.columns):
+                print(f"⚠️ Columnas faltantes en la hoja {anio}, se omite")
+                continue
+            if 'Perfil' in hoja.columns:
+                codigos = pd.Categorical(hoja['Perfil'].astype('string'), categories=perfiles).codes
+            else:
+                codigos = np.full(len(hoja), -1)
+            # Orden por Perfil y dentro de cada perfil por Este
+            orden = np.lexsort((hoja['Este'].to_numpy(), codigos))
+            grupo = archivo.create_group(anio)
+            grupo.create_dataset('Perfil', data=codigos[orden].astype(np.int32))
+            for columna in COORDENADAS:
+                valores = hoja[columna].to_numpy(np.float64)[orden]
+                origen = np.floor(np.nanmin(valores)) if columna in ORIGEN and len(valores) else 0.0
+                dataset = grupo.create_dataset(columna, data=(valores - origen).astype(np.float32))
+                dataset.attrs['origen'] = origen
+
+
+def almacen_vigente(ruta_excel, ruta_almacen):
+    # El almacén existe y es más nuevo que el Excel
+    return os.path.exists(ruta_almacen) and (
+        not os.path.exists(ruta_excel) or os.path.getmtime(ruta_almacen) >= os.path.getmtime(ruta_excel))
+
+
+def rangos_perfiles(codigos, n_perfiles):
+    # codigos ordenados -> inicio de cada Perfil: las filas del código c son
+    # rangos[c]:rangos[c + 1] (los puntos sin Perfil, código -1, van primero)
+    return np.searchsorted(codigos, np.arange(n_perfiles + 1), side='left')
+
+
+def calcular_talweg(datos, codigos, rangos):
+    # Fila de mínima cota de cada Perfil con puntos (primera en caso de
+    # empate), vectorizado sobre los rangos de filas
+    inicios = rangos[:-1]
+    con_puntos = np.flatnonzero(rangos[1:] > inicios)
+    if len(con_puntos) == 0:
+        return datos.iloc[:0]
+    cota = datos['Cota'].to_numpy()
+    orden = np.lexsort((np.arange(len(cota)), cota, codigos))
+    talweg = datos.iloc[orden[inicios[con_puntos]]]
+    return talweg.sort_values(by='Norte', kind='stable')
+
+
+class AlmacenBatimetria:
+    # Acceso perezoso al almacén: al abrir solo se leen los años y la lista
+    # de perfiles; cada año se lee la primera vez que se pide y queda en memoria.
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.archivo = h5py.File(ruta, 'r')
+        self.perfiles = [p.decode('utf-8') if isinstance(p, bytes) else p for p in self.archivo['perfiles'][()]]
+        self.anios = sorted((k for k in self.archivo if k != 'perfiles'), key=int)
+        self._codigos = {p: i for i, p in enumerate(self.perfiles)}
+        self._datos = {}
+        self._rangos = {}
+        self._talwegs = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self):
+        self.archivo.close()
+
+    def __contains__(self, anio):
+        return str(anio) in self.anios
+
+    def datos(self, anio):
+        # DataFrame del año (Perfil categórico, Cota float32), o None
+        anio = str(anio)
+        if anio not in self.anios:
+            return None
+        if anio not in self._datos:
+            grupo = self.archivo[anio]
+            codigos = grupo['Perfil'][()]
+            datos = pd.DataFrame({
+                'Perfil': pd.Categorical.from_codes(codigos, categories=self.perfiles),
+                **{columna: self._coordenada(grupo[columna]) for columna in COORDENADAS},
+            })
+            # Índices del año, calculados una sola vez al cargarlo
+            self._rangos[anio] = rangos_perfiles(codigos, len(self.perfiles))
+            self._talwegs[anio] = calcular_talweg(datos, codigos, self._rangos[anio])
+            self._datos[anio] = datos
+        return self._datos[anio]
+
+    def perfil(self, anio, perfil):
+        # Puntos de un Perfil (ordenados por Este) sin recorrer el año completo
+        datos = self.datos(anio)
+        if datos is None or perfil not in self._codigos:
+            return None
+        codigo = self._codigos[perfil]
+        rangos = self._rangos[str(anio)]
+        return datos.iloc[rangos[codigo]:rangos[codigo + 1]]
+
+    def talweg(self, anio):
+        # Punto de mínima cota de cada Perfil del año, ordenado por Norte
+        if self.datos(anio) is None:
+            return None
+        return self._talwegs[str(anio)]
+
+    @staticmethod
+    def _coordenada(dataset):
+        origen = float(dataset.attrs.get('origen', 0.0))
+        valores = dataset[()]
+        return valores if origen == 0.0 else valores.astype(np.float64) + origen
+
+    # Misma interfaz que el dict de hojas de pd.read_excel
+    get = datos
+
+
+def abrir_batimetria(ruta_excel, ruta_almacen=None):
+    # Abre el almacén, convirtiendo antes el Excel si no existe o quedó desactualizado
+    if ruta_almacen is None:
+        ruta_almacen = os.path.splitext(ruta_excel)[0] + '.h5'
+    if not almacen_vigente(ruta_excel, ruta_almacen):
+        print(f"Convirtiendo {ruta_excel} -> {ruta_almacen}")
+        convertir_excel(ruta_excel, ruta_almacen)
+    return AlmacenBatimetria(ruta_almacen)
@@ -0,0 +1,204 @@
+#benchmarks de resumen, RMSE, CFL, animacion y KNN sobre planes sinteticos de varios tamaños
+# Uso: python benchmarks/bench.py [--escalas chico mediano] [--casos cfl knn] [--repeticiones 3]
+# Cada corrida se agrega a historial_benchmarks.csv con la versión (git
+# describe) y se compara con la última corrida de otra versión.
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(CARPETA))
+
+from fixtures import crear_planes, estados_historicos  # noqa: E402
+
+# Tamaños de los planes sintéticos y de las cargas de cada caso
+ESCALAS = {
+    'chico': {'planes': 4, 'tiempos': 500, 'secciones': 50, 'frames': 10,
+              'dias_historicos': 3650, 'dias_sinteticos': 36500},
+    'mediano': {'planes': 8, 'tiempos': 5000, 'secciones': 200, 'frames': 20,
+                'dias_historicos': 18250, 'dias_sinteticos': 146000},
+    'grande': {'planes': 4, 'tiempos': 20000, 'secciones': 400, 'frames': 40,
+               'dias_historicos': 36500, 'dias_sinteticos': 365000},
+}
+REPETICIONES = 3  # se reporta el menor tiempo
+UMBRAL_REGRESION = 0.10  # +10 % de tiempo o de memoria respecto de la versión anterior
+HISTORIAL = os.path.join(CARPETA, 'historial_benchmarks.csv')
+CARPETA_PLANES = os.path.join(tempfile.gettempdir(), 'ras_benchmarks')
+
+
+# --- Casos: cada uno prepara su carga y devuelve (función a medir, unidades procesadas, unidad) ---
+def caso_resumen(rutas, escala):
+    from resumen_plan import procesar_planes
+    return lambda: procesar_planes(rutas, procesos=1), len(rutas), 'planes'
+
+
+def caso_rmse(rutas, escala):
+    from hdf_plan import PlanHDF
+    from metricas import curva_errores, puntuar_perfiles
+
+    with PlanHDF(rutas[0]) as plan:
+        observado = plan.invert_elevation[0] + 1.0
+    levantamientos = {2011: observado, 2018: observado - 2.0}
+
+    def correr():
+        finales = []
+        for ruta in rutas:
+            with PlanHDF(ruta) as plan:
+                finales.append(plan.invert_elevation[-1])
+            curva_errores(ruta, levantamientos)
+        return puntuar_perfiles(np.vstack(finales), np.vstack(list(levantamientos.values())))
+
+    return correr, len(rutas) * escala['tiempos'], 'pasos'
+
+
+def caso_cfl(rutas, escala):
+    from motor_cfl import analizar_cfl
+    return lambda: analizar_cfl(rutas[0]), escala['tiempos'] * escala['secciones'], 'valores'
+
+
+def _contexto_animacion(ruta, n_frames):
+    from animacion_invert import planificar_frames
+    from hdf_plan import PlanHDF
+    from muestreo_tiempos import seleccionar_indices
+
+    with PlanHDF(ruta) as plan:
+        tiempos = plan.tiempos()
+        indices = seleccionar_indices(tiempos, 'uniforme', n_frames)
+        filas = indices.tolist()
+        perfiles = dict(zip(filas, plan.invert_elevation[filas]))
+    contexto = {'perfiles': perfiles, 'label': 'sintético', 'color': 'brown', 'dpi': 100,
+                'observado': perfiles[0] + 1.0, 'label_observado': 'Observado'}
+    return contexto, planificar_frames(indices, tiempos)
+
+
+def caso_animacion(rutas, escala):
+    from animacion_invert import renderizar_frames
+    contexto, frames = _contexto_animacion(rutas[0], escala['frames'])
+    return lambda: sum(1 for _ in renderizar_frames(contexto, frames, procesos=1)), len(frames), 'frames'
+
+
+def caso_animacion_blit(rutas, escala):
+    from animacion_invert import AnimacionBlit
+    contexto, frames = _contexto_animacion(rutas[0], escala['frames'])
+    return lambda: sum(1 for _ in AnimacionBlit(contexto, frames).iterar()), len(frames), 'frames'
+
+
+def caso_knn(rutas, escala):
+    from knn_bootstrap import construir_tabla_knn, simular_indices
+    estados = estados_historicos(escala['dias_historicos'])
+    estandarizados = (estados - estados.mean(axis=0)) / estados.std(axis=0)
+    n_pasos = escala['dias_sinteticos']
+
+    def correr():
+        indices, pesos_acum = construir_tabla_knn(estandarizados, k=5)
+        return simular_indices(indices, pesos_acum, n_pasos, rng=np.random.default_rng(0))
+
+    return correr, n_pasos, 'días'
+
+
+CASOS = {
+    'resumen': caso_resumen,
+    'rmse': caso_rmse,
+    'cfl': caso_cfl,
+    'animacion': caso_animacion,
+    'animacion_blit': caso_animacion_blit,
+    'knn': caso_knn,
+}
+
+
+def medir(funcion, repeticiones):
+    # Menor tiempo de pared de las repeticiones y, en una corrida aparte (tracemalloc
+    # agrega costo), el pico de memoria asignada por Python y NumPy
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    try:
+        funcion()
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(tiempos), pico
+
+
+def version():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=CARPETA, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconocida'
+
+
+def correr(escalas, casos, repeticiones=REPETICIONES, carpeta_planes=CARPETA_PLANES):
+    filas = []
+    fecha = datetime.now().isoformat(timespec='seconds')
+    ver = version()
+    for nombre_escala in escalas:
+        escala = ESCALAS[nombre_escala]
+        rutas = crear_planes(os.path.join(carpeta_planes, nombre_escala), escala['planes'],
+                             escala['tiempos'], escala['secciones'])
+        for nombre_caso in casos:
+            funcion, unidades, unidad = CASOS[nombre_caso](rutas, escala)
+            segundos, pico = medir(funcion, repeticiones)
+            filas.append({
+                'Fecha': fecha, 'Versión': ver, 'Escala': nombre_escala, 'Caso': nombre_caso,
+                'Segundos': segundos, 'Unidades': unidades, 'Unidad': unidad,
+                'Throughput (u/s)': unidades / segundos, 'Pico memoria (MB)': pico / 2 ** 20,
+            })
+            print(f"  {nombre_escala:8s} {nombre_caso:15s} {segundos:9.3f} s  "
+                  f"{unidades / segundos:12,.0f} {unidad}/s  {pico / 2 ** 20:8.1f} MB")
+    return pd.DataFrame(filas)
+
+
+def comparar(resultados, historial):
+    # Cambio respecto de la última corrida de otra versión para cada (escala, caso)
+    anteriores = historial[historial['Versión'] != resultados['Versión'].iloc[0]]
+    if anteriores.empty:
+        return None
+    ultimas = anteriores.sort_values('Fecha').groupby(['Escala', 'Caso']).last()
+    tabla = resultados.join(ultimas[['Versión', 'Segundos', 'Pico memoria (MB)']], on=['Escala', 'Caso'],
+                            rsuffix=' anterior').dropna(subset=['Segundos anterior'])
+    tabla['Cambio tiempo (%)'] = (tabla['Segundos'] / tabla['Segundos anterior'] - 1) * 100
+    tabla['Cambio memoria (%)'] = (tabla['Pico memoria (MB)'] / tabla['Pico memoria (MB) anterior'] - 1) * 100
+    regresion = ((tabla['Cambio tiempo (%)'] > UMBRAL_REGRESION * 100)
+                 | (tabla['Cambio memoria (%)'] > UMBRAL_REGRESION * 100))
+    tabla['Regresión'] = np.where(regresion, '⚠️', '')
+    return tabla[['Escala', 'Caso', 'Versión anterior', 'Cambio tiempo (%)', 'Cambio memoria (%)', 'Regresión']]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks sobre planes HEC-RAS sintéticos')
+    parser.add_argument('--escalas', nargs='+', choices=list(ESCALAS), default=['chico', 'mediano'])
+    parser.add_argument('--casos', nargs='+', choices=list(CASOS), default=list(CASOS))
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES)
+    parser.add_argument('--carpeta-planes', default=CARPETA_PLANES, help='dónde se generan los planes sintéticos')
+    parser.add_argument('--historial', default=HISTORIAL)
+    parser.add_argument('--sin-historial', action='store_true', help='no agregar la corrida al historial')
+    args = parser.parse_args(argv)
+
+    print(f"Versión {version()}, planes sintéticos en {args.carpeta_planes}")
+    resultados = correr(args.escalas, args.casos, args.repeticiones, args.carpeta_planes)
+
+    if os.path.exists(args.historial):
+        cambios = comparar(resultados, pd.read_csv(args.historial))
+        if cambios is not None and not cambios.empty:
+            print("\nComparación con la versión anterior:")
+            print(tabulate(cambios, headers='keys', floatfmt='+.1f', tablefmt='grid', showindex=False))
+    if not args.sin_historial:
+        resultados.to_csv(args.historial, mode='a', index=False, header=not os.path.exists(args.historial))
+        print(f"\n✓ Resultados agregados a {args.historial}")
+
+
+if __name__ == '__main__':
+    main()
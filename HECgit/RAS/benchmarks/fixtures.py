@@ -0,0 +1,113 @@
+#planes HDF sinteticos con la misma estructura que los Test.pNN.hdf de HEC-RAS
+import os
+
+import h5py
+import numpy as np
+
+VERSION_SINTETICA = b'HEC-RAS 6.3.1 September 2022 (sintetico)'
+RUTA_SERIES = 'Results/Unsteady/Output/Output Blocks/Sediment/Sediment Time Series'
+RUTA_TIEMPO_COMPUTO = 'Results/Unsteady/Output/Output Blocks/Computation Block/Global/Time'
+INICIO = np.datetime64('2011-01-01T01:00:00', 's')
+MESES = np.array(['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC'])
+
+
+def marcas_tiempo(tiempos):
+    # datetime64 -> b"01JAN2011 01:00:00" (formato de Time Date Stamp)
+    dias = tiempos.astype('datetime64[D]')
+    meses = tiempos.astype('datetime64[M]')
+    anios = tiempos.astype('datetime64[Y]').astype(int) + 1970
+    dia = (dias - meses.astype('datetime64[D]')).astype(int) + 1
+    segundos = (tiempos - dias.astype('datetime64[s]')).astype(int)
+    texto = np.char.add(np.char.zfill(dia.astype(str), 2), MESES[meses.astype(int) % 12])
+    texto = np.char.add(texto, anios.astype(str))
+    hora = np.char.add(np.char.zfill((segundos // 3600).astype(str), 2), ':')
+    hora = np.char.add(hora, np.char.zfill((segundos // 60 % 60).astype(str), 2))
+    hora = np.char.add(np.char.add(hora, ':'), np.char.zfill((segundos % 60).astype(str), 2))
+    return np.char.add(np.char.add(texto, ' '), hora).astype('S19')
+
+
+def crear_plan(ruta, n_tiempos, n_secciones, puntos_seccion=20, semilla=0, factor=1.0,
+               paso=np.timedelta64(1, 'D'), tam_bloque=4096):
+    # Plan con Results/Unsteady/Summary, Sediment Time Series (Invert
+    # Elevation, Effective Depth, Time Date Stamp), el tiempo del bloque de
+    # cómputo y Geometry/Cross Sections. Las series se escriben por bloques
+    # de tiempo, así la memoria no depende de n_tiempos.
+    rng = np.random.default_rng(semilla)
+    with h5py.File(ruta, 'w') as f:
+        f.attrs['File Version'] = VERSION_SINTETICA
+        f.create_group('Plan Data/Plan Information').attrs['Plan Title'] = np.bytes_(os.path.basename(ruta))
+
+        resumen = f.create_group('Results/Unsteady/Summary')
+        resumen.attrs['Vol Accounting in'] = b'Tonnes'
+        resumen.attrs['Sediment Cum In Mass'] = np.bytes_(f'{1.0e6 * factor:.2f} tonnes')
+        resumen.attrs['Sediment Cum Out Mass'] = np.bytes_(f'{3.0e5 * factor:.2f} tonnes')
+        resumen.attrs['Sediment Cum In Vol'] = np.bytes_(f'{8.0e5 * factor:.2f} m3')
+        resumen.attrs['Sediment Cum Out Vol'] = np.bytes_(f'{2.5e5 * factor:.2f} m3')
+        resumen.attrs['Computation Time Total'] = b'01:02:03'
+
+        # Series de sedimentos, con chunks por filas como las escribe HEC-RAS
+        chunks = (min(n_tiempos, 64), n_secciones)
+        invert = f.create_dataset(RUTA_SERIES + '/Cross Sections/Invert Elevation',
+                                  (n_tiempos, n_secciones), dtype='f4', chunks=chunks)
+        profundidad = f.create_dataset(RUTA_SERIES + '/Cross Sections/Effective Depth',
+                                       (n_tiempos, n_secciones), dtype='f4', chunks=chunks)
+        estampas = f.create_dataset(RUTA_SERIES + '/Time Date Stamp', (n_tiempos,), dtype='S19')
+        nivel = np.linspace(200.0, 60.0, n_secciones)
+        for desde in range(0, n_tiempos, tam_bloque):
+            n = min(tam_bloque, n_tiempos - desde)
+            nivel = nivel + np.cumsum(rng.normal(0.0, 0.05, (n, n_secciones)), axis=0)
+            invert[desde:desde + n] = nivel
+            profundidad[desde:desde + n] = 10.0 + 5.0 * rng.random((n, n_secciones))
+            nivel = nivel[-1]
+            estampas[desde:desde + n] = marcas_tiempo(INICIO + paso * np.arange(desde, desde + n))
+
+        # Tiempo del bloque de cómputo (días desde el inicio), paso de 1 hora
+        f.create_dataset(RUTA_TIEMPO_COMPUTO, data=np.arange(min(n_tiempos * 24, 1 << 20)) / 24.0)
+
+        # Geometría: secciones transversales de puntos_seccion puntos, aguas abajo hacia el sur
+        inicios = np.arange(n_secciones) * puntos_seccion
+        info = np.column_stack([inicios, np.full(n_secciones, puntos_seccion),
+                                np.arange(n_secciones), np.ones(n_secciones)]).astype('i4')
+        estacion = np.tile(np.linspace(0.0, 5000.0, puntos_seccion), n_secciones)
+        seccion = np.repeat(np.arange(n_secciones), puntos_seccion)
+        forma = np.abs(np.linspace(-1.0, 1.0, puntos_seccion))
+        cota = 100.0 + 60.0 * np.tile(forma, n_secciones) - seccion * 0.3 + rng.normal(0, 0.5, len(seccion))
+        geometria = f.create_group('Geometry/Cross Sections')
+        geometria.create_dataset('Polyline Info', data=info)
+        geometria.create_dataset('Polyline Points', data=np.column_stack([estacion, -seccion * 2000.0]))
+        geometria.create_dataset('Station Elevation Info', data=info[:, :2])
+        geometria.create_dataset('Station Elevation Values', data=np.column_stack([estacion, cota]).astype('f4'))
+    return ruta
+
+
+def crear_planes(carpeta, n_planes, n_tiempos, n_secciones, puntos_seccion=20):
+    # Test.p1.hdf ... Test.pN.hdf en carpeta; los que ya existen con el mismo
+    # tamaño pedido se reutilizan
+    os.makedirs(carpeta, exist_ok=True)
+    rutas = []
+    for i in range(1, n_planes + 1):
+        ruta = os.path.join(carpeta, f'Test.p{i}.hdf')
+        if not _vigente(ruta, n_tiempos, n_secciones):
+            crear_plan(ruta, n_tiempos, n_secciones, puntos_seccion, semilla=i, factor=1 + 0.01 * i)
+        rutas.append(ruta)
+    return rutas
+
+
+def _vigente(ruta, n_tiempos, n_secciones):
+    if not os.path.exists(ruta):
+        return False
+    try:
+        with h5py.File(ruta, 'r') as f:
+            return f[RUTA_SERIES + '/Cross Sections/Invert Elevation'].shape == (n_tiempos, n_secciones)
+    except (OSError, KeyError):
+        return False
+
+
+def estados_historicos(n_dias, semilla=0):
+    # Serie diaria sintética de (caudal, nivel) con estacionalidad, como la
+    # planilla de condiciones de borde del bootstrap KNN
+    rng = np.random.default_rng(semilla)
+    dia = np.arange(n_dias)
+    caudal = 10000 + 4000 * np.sin(2 * np.pi * dia / 365.25) + rng.gamma(2.0, 800.0, n_dias)
+    nivel = 219 + 0.5 * np.sin(2 * np.pi * dia / 365.25 + 1.0) + rng.normal(0, 0.1, n_dias)
+    return np.column_stack([caudal, nivel])
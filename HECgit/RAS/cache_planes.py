@@ -0,0 +1,129 @@
+#cache en disco (SQLite) de los datos extraidos de cada plan HEC-RAS
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+from hdf_plan import PlanHDF, RUTA_INVERT, RUTA_RESUMEN, RUTA_TIEMPOS, mapear_planes
+
+ESQUEMA = '''
+CREATE TABLE IF NOT EXISTS planes (
+    ruta TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    tamano INTEGER,
+    resumen TEXT,
+    invert_final BLOB,
+    tiempo_inicio TEXT,
+    tiempo_fin TEXT,
+    n_tiempos INTEGER
+)
+'''
+
+
+def _a_json(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    return str(valor)
+
+
+def extraer_datos_plan(ruta):
+    # Lo que se guarda de cada plan: atributos del resumen, perfil final
+    # del fondo y rango de marcas temporales
+    try:
+        with PlanHDF(ruta) as plan:
+            datos = {'resumen': plan.resumen() if plan.existe(RUTA_RESUMEN) else None,
+                     'invert_final': None, 'tiempo_inicio': None, 'tiempo_fin': None, 'n_tiempos': 0}
+            if plan.existe(RUTA_INVERT):
+                datos['invert_final'] = np.asarray(plan.invert_elevation[-1], dtype=np.float64)
+            if plan.existe(RUTA_TIEMPOS):
+                datos['n_tiempos'] = len(plan.time_stamps)
+                if datos['n_tiempos']:
+                    datos['tiempo_inicio'] = plan.tiempos_texto(0)[0]
+                    datos['tiempo_fin'] = plan.tiempos_texto(-1)[0]
+            return datos
+    except Exception as e:
+        print(f"❌ Error en archivo {ruta}: {e}")
+        return None
+
+
+class CachePlanes:
+    # Cache indexado por ruta. Una entrada vale solo mientras coincidan
+    # mtime y tamaño; cualquier cambio de uno u otro vuelve a leer el HDF.
+    def __init__(self, ruta_db):
+        self.conexion = sqlite3.connect(ruta_db)
+        self.conexion.execute(ESQUEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def _leer(self, ruta):
+        fila = self.conexion.execute(
+            'SELECT mtime_ns, tamano, resumen, invert_final, tiempo_inicio, tiempo_fin, n_tiempos '
+            'FROM planes WHERE ruta = ?', (ruta,)).fetchone()
+        if fila is None:
+            return None
+        mtime_ns, tamano, resumen, invert_final, inicio, fin, n_tiempos = fila
+        datos = {
+            'resumen': json.loads(resumen),
+            'invert_final': None if invert_final is None else np.frombuffer(invert_final, dtype=np.float64),
+            'tiempo_inicio': inicio, 'tiempo_fin': fin, 'n_tiempos': n_tiempos,
+        }
+        return (mtime_ns, tamano), datos
+
+    def _guardar(self, ruta, estado, datos):
+        invert_final = datos['invert_final']
+        self.conexion.execute(
+            'INSERT OR REPLACE INTO planes (ruta, mtime_ns, tamano, resumen, invert_final, tiempo_inicio, '
+            'tiempo_fin, n_tiempos) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (ruta, estado.st_mtime_ns, estado.st_size,
+             json.dumps(datos['resumen'], default=_a_json),
+             None if invert_final is None else invert_final.tobytes(),
+             datos['tiempo_inicio'], datos['tiempo_fin'], datos['n_tiempos']))
+
+    def _vigente(self, ruta, estado):
+        # Devuelve los datos cacheados si siguen valiendo para el archivo actual
+        registro = self._leer(ruta)
+        if registro is None:
+            return None
+        (mtime_ns, tamano), datos = registro
+        if mtime_ns == estado.st_mtime_ns and tamano == estado.st_size:
+            return datos
+        return None
+
+    def obtener_varios(self, rutas, procesos=None, hilos=False):
+        # Datos de cada plan (None si no se pudo leer), en el orden de rutas.
+        # Solo los planes nuevos o modificados se abren, y en paralelo.
+        rutas = [os.path.abspath(r) for r in rutas]
+        resultados = [None] * len(rutas)
+        pendientes = []
+        for i, ruta in enumerate(rutas):
+            if not os.path.exists(ruta):
+                print(f"⚠️ Archivo no encontrado: {ruta}")
+                continue
+            estado = os.stat(ruta)
+            datos = self._vigente(ruta, estado)
+            if datos is not None:
+                resultados[i] = datos
+            else:
+                pendientes.append((i, ruta, estado))
+
+        extraidos = mapear_planes(extraer_datos_plan, [p[1] for p in pendientes], procesos, hilos)
+        for (i, ruta, estado), datos in zip(pendientes, extraidos):
+            if datos is None:
+                continue
+            self._guardar(ruta, estado, datos)
+            resultados[i] = datos
+        self.conexion.commit()
+        return resultados
+
+    def obtener(self, ruta):
+        return self.obtener_varios([ruta], procesos=1)[0]
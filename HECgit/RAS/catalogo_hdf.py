@@ -0,0 +1,192 @@
+#catalogo indexado (SQLite) de la estructura de los archivos de plan HEC-RAS
+import json
+import os
+import sqlite3
+
+import h5py
+import numpy as np
+import pandas as pd
+
+from hdf_plan import decodificar, mapear_planes
+
+# Valores de atributo más largos se guardan truncados
+MAX_TEXTO_ATRIBUTO = 2000
+
+ESQUEMA = '''
+CREATE TABLE IF NOT EXISTS archivos (
+    id INTEGER PRIMARY KEY,
+    ruta TEXT UNIQUE,
+    mtime_ns INTEGER,
+    tamano INTEGER,
+    version TEXT
+);
+CREATE TABLE IF NOT EXISTS objetos (
+    archivo INTEGER,
+    ruta TEXT,
+    tipo TEXT,
+    shape TEXT,
+    dtype TEXT,
+    chunks TEXT,
+    compresion TEXT,
+    n_atributos INTEGER,
+    PRIMARY KEY (archivo, ruta)
+);
+CREATE TABLE IF NOT EXISTS atributos (
+    archivo INTEGER,
+    ruta TEXT,
+    nombre TEXT,
+    valor TEXT,
+    PRIMARY KEY (archivo, ruta, nombre)
+);
+CREATE INDEX IF NOT EXISTS objetos_ruta ON objetos (ruta);
+CREATE INDEX IF NOT EXISTS atributos_nombre ON atributos (nombre);
+'''
+
+
+def _texto_atributo(valor):
+    if isinstance(valor, (bytes, np.bytes_)):
+        texto = decodificar(valor).strip()
+    elif isinstance(valor, np.ndarray):
+        texto = json.dumps([decodificar(v) if isinstance(v, bytes) else v for v in valor.ravel().tolist()],
+                           default=str)
+    elif isinstance(valor, np.generic):
+        texto = str(valor.item())
+    else:
+        texto = str(valor)
+    return texto[:MAX_TEXTO_ATRIBUTO]
+
+
+def recorrer_estructura(ruta):
+    # Filas de objetos y atributos de un archivo (sin leer datos de los datasets)
+    objetos = []
+    atributos = []
+
+    def agregar(nombre, objeto):
+        for clave, valor in objeto.attrs.items():
+            atributos.append((nombre, clave, _texto_atributo(valor)))
+        if isinstance(objeto, h5py.Dataset):
+            objetos.append((nombre, 'dataset', json.dumps(objeto.shape), str(objeto.dtype),
+                            json.dumps(objeto.chunks), objeto.compression, len(objeto.attrs)))
+        else:
+            objetos.append((nombre, 'grupo', None, None, None, None, len(objeto.attrs)))
+
+    try:
+        with h5py.File(ruta, 'r') as archivo:
+            version = _texto_atributo(archivo.attrs.get('File Version', b''))
+            agregar('/', archivo)
+            archivo.visititems(lambda nombre, objeto: agregar('/' + nombre, objeto))
+    except Exception as e:
+        print(f"❌ Error en archivo {ruta}: {e}")
+        return None
+    return version, objetos, atributos
+
+
+class CatalogoHDF:
+    # Catálogo de grupos, datasets (shape, dtype, chunks, compresión) y
+    # atributos de muchos planes. Solo se recorren los archivos nuevos o
+    # modificados: cualquier cambio de mtime o tamaño, como en CachePlanes.
+    def __init__(self, ruta_db):
+        self.conexion = sqlite3.connect(ruta_db)
+        self.conexion.executescript(ESQUEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def _vigente(self, ruta, estado):
+        fila = self.conexion.execute('SELECT mtime_ns, tamano FROM archivos WHERE ruta = ?',
+                                     (ruta,)).fetchone()
+        return fila is not None and fila == (estado.st_mtime_ns, estado.st_size)
+
+    def _guardar(self, ruta, estado, resultado):
+        version, objetos, atributos = resultado
+        fila = self.conexion.execute('SELECT id FROM archivos WHERE ruta = ?', (ruta,)).fetchone()
+        if fila is not None:
+            self.conexion.execute('DELETE FROM objetos WHERE archivo = ?', fila)
+            self.conexion.execute('DELETE FROM atributos WHERE archivo = ?', fila)
+            self.conexion.execute('UPDATE archivos SET mtime_ns = ?, tamano = ?, version = ? WHERE id = ?',
+                                  (estado.st_mtime_ns, estado.st_size, version, fila[0]))
+            archivo = fila[0]
+        else:
+            archivo = self.conexion.execute(
+                'INSERT INTO archivos (ruta, mtime_ns, tamano, version) VALUES (?, ?, ?, ?)',
+                (ruta, estado.st_mtime_ns, estado.st_size, version)).lastrowid
+        self.conexion.executemany('INSERT INTO objetos VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                  [(archivo,) + o for o in objetos])
+        self.conexion.executemany('INSERT OR REPLACE INTO atributos VALUES (?, ?, ?, ?)',
+                                  [(archivo,) + a for a in atributos])
+
+    def actualizar(self, rutas, procesos=None):
+        # Recorre en paralelo los archivos nuevos o modificados; devuelve
+        # cuántos se recorrieron
+        pendientes = []
+        for ruta in (os.path.abspath(r) for r in rutas):
+            if not os.path.exists(ruta):
+                print(f"⚠️ Archivo no encontrado: {ruta}")
+                continue
+            estado = os.stat(ruta)
+            if not self._vigente(ruta, estado):
+                pendientes.append((ruta, estado))
+
+        estructuras = mapear_planes(recorrer_estructura, [p[0] for p in pendientes], procesos)
+        recorridos = 0
+        for (ruta, estado), resultado in zip(pendientes, estructuras):
+            if resultado is None:
+                continue
+            self._guardar(ruta, estado, resultado)
+            recorridos += 1
+        self.conexion.commit()
+        return recorridos
+
+    def quitar_ausentes(self):
+        # Borra del catálogo los archivos que ya no existen en disco
+        ausentes = [(i,) for i, r in self.conexion.execute('SELECT id, ruta FROM archivos')
+                    if not os.path.exists(r)]
+        for tabla in ('objetos', 'atributos'):
+            self.conexion.executemany(f'DELETE FROM {tabla} WHERE archivo = ?', ausentes)
+        self.conexion.executemany('DELETE FROM archivos WHERE id = ?', ausentes)
+        self.conexion.commit()
+        return len(ausentes)
+
+    def _consulta(self, sql, parametros=()):
+        return pd.read_sql_query(sql, self.conexion, params=parametros)
+
+    def planes_con(self, ruta_objeto):
+        # Planes que contienen el grupo o dataset, con su shape/dtype/chunks
+        return self._consulta(
+            'SELECT a.ruta AS archivo, o.tipo, o.shape, o.dtype, o.chunks, o.compresion '
+            'FROM objetos o JOIN archivos a ON a.id = o.archivo WHERE o.ruta = ? ORDER BY a.ruta',
+            ('/' + ruta_objeto.strip('/'),))
+
+    def buscar(self, patron, tipo=None):
+        # Objetos cuyo camino coincide con el patrón GLOB ('*Invert*'), con la
+        # cantidad de planes que lo contienen y las shapes distintas
+        sql = ('SELECT ruta, tipo, COUNT(*) AS planes, GROUP_CONCAT(DISTINCT shape) AS shapes, '
+               'GROUP_CONCAT(DISTINCT dtype) AS dtypes FROM objetos WHERE ruta GLOB ?')
+        parametros = [patron]
+        if tipo is not None:
+            sql += ' AND tipo = ?'
+            parametros.append(tipo)
+        return self._consulta(sql + ' GROUP BY ruta, tipo ORDER BY ruta', parametros)
+
+    def atributos(self, ruta_objeto, nombre=None):
+        # Valor de los atributos de un objeto en cada plan
+        sql = ('SELECT a.ruta AS archivo, t.nombre, t.valor FROM atributos t '
+               'JOIN archivos a ON a.id = t.archivo WHERE t.ruta = ?')
+        parametros = ['/' + ruta_objeto.strip('/')]
+        if nombre is not None:
+            sql += ' AND t.nombre = ?'
+            parametros.append(nombre)
+        return self._consulta(sql + ' ORDER BY a.ruta, t.nombre', parametros)
+
+    def estructura(self, ruta_archivo):
+        # Árbol completo de un archivo, como el visititems de scratch_8, sin abrirlo
+        return self._consulta(
+            'SELECT o.ruta, o.tipo, o.shape, o.dtype, o.chunks, o.compresion, o.n_atributos '
+            'FROM objetos o JOIN archivos a ON a.id = o.archivo WHERE a.ruta = ? ORDER BY o.ruta',
+            (os.path.abspath(ruta_archivo),))
@@ -0,0 +1,94 @@
+#escritura por bloques de series sinteticas diarias a CSV y DSS
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+try:
+    from pydsstools.heclib.dss import HecDss
+    from pydsstools.core import TimeSeriesContainer
+except ImportError:
+    HecDss = None
+    TimeSeriesContainer = None
+
+# (columna, pathname, unidades) de cada serie que se escribe en el DSS
+SERIES_DSS = [
+    ('Flow', "/ITAIPU/GUAIRA/FLOW//1DAY/SYNTHETIC/", "CMS"),
+    ('Level', "/ITAIPU/USINA/STAGE//1DAY/SYNTHETIC/", "M"),
+]
+
+
+class _ContenedorLocal:
+    # Sustituto minimo de TimeSeriesContainer cuando no hay pydsstools
+    pass
+
+
+class _DssLocal:
+    # Sustituto de HecDss cuando pydsstools no esta instalado: guarda cada
+    # bloque como texto (pathname, fecha, valor) junto al .dss pedido.
+    def __init__(self, ruta):
+        self.ruta = os.path.splitext(ruta)[0] + '_dss.csv'
+        self._archivo = None
+
+    def __enter__(self):
+        self._archivo = open(self.ruta, 'w', encoding='utf-8')
+        self._archivo.write('Pathname,Date,Value,Units\n')
+        return self
+
+    def __exit__(self, *exc):
+        self._archivo.close()
+
+    def put_ts(self, contenedor):
+        inicio = datetime.strptime(contenedor.startDateTime.title(), '%d%b%Y %H:%M')
+        for i, valor in enumerate(contenedor.values):
+            fecha = (inicio + timedelta(days=i)).strftime('%Y-%m-%d')
+            self._archivo.write(f"{contenedor.pathname},{fecha},{valor},{contenedor.units}\n")
+
+
+class EscritorSeries:
+    # Escribe bloques consecutivos de dias al CSV y al DSS a medida que el
+    # generador los produce, sin mantener la serie completa en memoria.
+    def __init__(self, output_csv, output_dss, start_date):
+        self.output_csv = output_csv
+        self.output_dss = output_dss
+        self.fecha_bloque = np.datetime64(start_date, 'D')
+        self.local = HecDss is None
+        self._dss = None
+        self._primer_bloque = True
+
+    def __enter__(self):
+        if self.local:
+            print("⚠️ pydsstools no está instalado, se usa el escritor local")
+            self._dss = _DssLocal(self.output_dss).__enter__()
+        else:
+            self._dss = HecDss.Open(self.output_dss).__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self._dss.__exit__(*exc)
+
+    def escribir(self, flow, level):
+        n = len(flow)
+        fechas = self.fecha_bloque + np.arange(n)
+        bloque = pd.DataFrame({'Date': fechas, 'Flow': flow, 'Level': level})
+
+        # CSV: cabecera solo en el primer bloque, el resto se agrega
+        bloque.to_csv(self.output_csv, index=False, header=self._primer_bloque,
+                      mode='w' if self._primer_bloque else 'a')
+
+        # DSS: un contenedor por serie y por bloque, con su propia fecha de inicio
+        start_str = pd.Timestamp(self.fecha_bloque).strftime('%d%b%Y %H:%M').upper()
+        for columna, pathname, unidades in SERIES_DSS:
+            contenedor = _ContenedorLocal() if self.local else TimeSeriesContainer()
+            contenedor.pathname = pathname
+            contenedor.startDateTime = start_str
+            contenedor.interval = 1
+            contenedor.values = bloque[columna].values.tolist()
+            contenedor.numberValues = n
+            contenedor.units = unidades
+            contenedor.type = "INST"
+            self._dss.put_ts(contenedor)
+
+        self.fecha_bloque += n
+        self._primer_bloque = False
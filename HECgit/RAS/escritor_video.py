@@ -0,0 +1,71 @@
+#escritura de frames RGB directo a MP4 (y opcionalmente GIF) a medida que se rasterizan
+import cv2
+import numpy as np
+from PIL import Image, GifImagePlugin
+
+from instrumentacion import medido
+
+
+class _GifIncremental:
+    # GIF escrito frame a frame con las utilidades de bajo nivel de PIL
+    # (getheader/getdata): cada frame se cuantiza con su propia paleta y se
+    # escribe al archivo, sin acumular los frames como hace save_all.
+    def __init__(self, ruta, duracion, loop=0):
+        self.ruta = ruta
+        self.duracion = duracion
+        self.loop = loop
+        self._archivo = None
+
+    def escribir(self, rgb):
+        imagen = Image.fromarray(rgb).quantize()
+        if self._archivo is None:
+            self._archivo = open(self.ruta, 'wb')
+            cabecera, _ = GifImagePlugin.getheader(imagen, info={'loop': self.loop})
+            self._archivo.write(b''.join(cabecera))
+        datos = GifImagePlugin.getdata(imagen, duration=self.duracion, include_color_table=True)
+        self._archivo.write(b''.join(datos))
+
+    def cerrar(self):
+        if self._archivo is not None:
+            self._archivo.write(b';')  # fin del GIF
+            self._archivo.close()
+            self._archivo = None
+
+
+class EscritorVideo:
+    # Recibe los buffers RGB del canvas y los pasa directamente al
+    # cv2.VideoWriter (y al GIF si se pide). El tamaño se toma del primer
+    # frame; en memoria nunca hay más de un frame.
+    def __init__(self, mp4_path, fps, output_gif=None, fourcc='mp4v'):
+        self.mp4_path = mp4_path
+        self.fps = fps
+        self.fourcc = fourcc
+        self.gif = _GifIncremental(output_gif, 1000 // fps) if output_gif else None
+        self._video = None
+        self.n_frames = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    @medido('video.escribir')
+    def escribir(self, rgb):
+        alto, ancho = rgb.shape[:2]
+        if self._video is None:
+            self._video = cv2.VideoWriter(self.mp4_path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps,
+                                          (ancho, alto))
+            if not self._video.isOpened():
+                raise IOError(f"No se pudo abrir el video {self.mp4_path}")
+        self._video.write(cv2.cvtColor(np.ascontiguousarray(rgb), cv2.COLOR_RGB2BGR))  # OpenCV usa BGR
+        if self.gif is not None:
+            self.gif.escribir(rgb)
+        self.n_frames += 1
+
+    def cerrar(self):
+        if self._video is not None:
+            self._video.release()
+            self._video = None
+        if self.gif is not None:
+            self.gif.cerrar()
@@ -0,0 +1,202 @@
+#lector compartido de archivos de plan HEC-RAS (Test.pNN.hdf)
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import h5py
+import numpy as np
+
+from instrumentacion import etapa, medido
+
+RUTA_SERIES_SEDIMENTOS = 'Results/Unsteady/Output/Output Blocks/Sediment/Sediment Time Series'
+RUTA_INVERT = RUTA_SERIES_SEDIMENTOS + '/Cross Sections/Invert Elevation'
+RUTA_PROFUNDIDAD = RUTA_SERIES_SEDIMENTOS + '/Cross Sections/Effective Depth'
+RUTA_TIEMPOS = RUTA_SERIES_SEDIMENTOS + '/Time Date Stamp'
+RUTA_TIEMPO_COMPUTO = 'Results/Unsteady/Output/Output Blocks/Computation Block/Global/Time'
+RUTA_RESUMEN = 'Results/Unsteady/Summary'
+RUTA_SECCIONES = 'Geometry/Cross Sections'
+
+
+MESES = np.array([b'APR', b'AUG', b'DEC', b'FEB', b'JAN', b'JUL',
+                  b'JUN', b'MAR', b'MAY', b'NOV', b'OCT', b'SEP'])
+NUMERO_MES = np.array([4, 8, 12, 2, 1, 7, 6, 3, 5, 11, 10, 9])
+
+
+def decodificar(valor):
+    return valor.decode('utf-8') if isinstance(valor, bytes) else str(valor)
+
+
+@medido('hdf.decodificar_tiempos')
+def decodificar_tiempos(crudos):
+    # Marcas "01JAN2011 01:00:00" -> datetime64[s], sin strptime por elemento.
+    # Las horas "24:00:00" de HEC-RAS pasan al día siguiente.
+    texto = np.char.upper(np.char.strip(np.atleast_1d(np.asarray(crudos)).astype('S')))
+    if texto.size == 0:
+        return np.array([], dtype='datetime64[s]')
+    if texto.dtype.itemsize < 18:
+        raise ValueError(f"Formato de marca temporal no reconocido: {texto[0]!r}")
+    caracteres = texto.astype('S18').view('S1').reshape(-1, 18)
+    digitos = caracteres.view(np.uint8).astype(np.int64) - ord('0')
+
+    dia = digitos[:, 0] * 10 + digitos[:, 1]
+    anio = digitos[:, 5:9] @ np.array([1000, 100, 10, 1])
+    hora = digitos[:, 10] * 10 + digitos[:, 11]
+    minuto = digitos[:, 13] * 10 + digitos[:, 14]
+    segundo = digitos[:, 16] * 10 + digitos[:, 17]
+
+    nombre_mes = np.ascontiguousarray(caracteres[:, 2:5]).view('S3').ravel()
+    posicion = np.clip(np.searchsorted(MESES, nombre_mes), 0, len(MESES) - 1)
+    if not np.all(MESES[posicion] == nombre_mes):
+        raise ValueError("Mes no reconocido en las marcas temporales")
+    mes = NUMERO_MES[posicion]
+
+    fechas = ((anio - 1970).astype('datetime64[Y]') + (mes - 1).astype('timedelta64[M]')).astype('datetime64[D]')
+    return (fechas + (dia - 1).astype('timedelta64[D]')).astype('datetime64[s]') + \
+        (hora * 3600 + minuto * 60 + segundo).astype('timedelta64[s]')
+
+
+class DatasetPerezoso:
+    # Envoltorio de un dataset del plan: no lee nada al crearse y cada
+    # indexacion lee solo el hiperslab pedido (plan.invert_elevation[-1]
+    # lee una unica fila, no el dataset completo).
+    def __init__(self, plan, ruta):
+        self._plan = plan
+        self.ruta = ruta
+        self._dataset = None
+
+    @property
+    def dataset(self):
+        if self._dataset is None:
+            self._dataset = self._plan.archivo[self.ruta]
+        return self._dataset
+
+    @property
+    def shape(self):
+        return self.dataset.shape
+
+    @property
+    def dtype(self):
+        return self.dataset.dtype
+
+    @property
+    def ndim(self):
+        return self.dataset.ndim
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, seleccion):
+        with etapa('hdf.leer'):
+            return self.dataset[seleccion]
+
+    def __array__(self, dtype=None, copy=None):
+        datos = self[()]
+        return datos if dtype is None else datos.astype(dtype)
+
+    def bloques(self, tam_bloque=1024):
+        # Recorre el dataset por bloques de filas (eje del tiempo)
+        for desde in range(0, len(self), tam_bloque):
+            yield desde, self[desde:desde + tam_bloque]
+
+
+class PlanHDF:
+    # Plan de HEC-RAS abierto en modo lectura. Los resultados se exponen
+    # como DatasetPerezoso; usar como context manager para cerrar el archivo.
+    def __init__(self, ruta):
+        self.ruta = ruta
+        with etapa('hdf.abrir'):
+            self.archivo = h5py.File(ruta, 'r')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self):
+        self.archivo.close()
+
+    @property
+    def version(self):
+        # Versión de HEC-RAS que escribió el archivo ("HEC-RAS 6.3.1 ...")
+        return decodificar(self.archivo.attrs.get('File Version', b'')).strip()
+
+    def existe(self, ruta):
+        return ruta in self.archivo
+
+    def dataset(self, ruta):
+        return DatasetPerezoso(self, ruta)
+
+    @property
+    def invert_elevation(self):
+        return self.dataset(RUTA_INVERT)
+
+    @property
+    def effective_depth(self):
+        return self.dataset(RUTA_PROFUNDIDAD)
+
+    @property
+    def time_stamps(self):
+        return self.dataset(RUTA_TIEMPOS)
+
+    @property
+    def computation_time(self):
+        return self.dataset(RUTA_TIEMPO_COMPUTO)
+
+    def tiempos_texto(self, seleccion=slice(None)):
+        # Marcas temporales como texto ("01JAN2011 01:00:00")
+        datos = np.atleast_1d(self.time_stamps[seleccion])
+        return [decodificar(t).strip() for t in datos]
+
+    def tiempos(self, seleccion=slice(None)):
+        # Marcas temporales decodificadas como datetime64[s]
+        return decodificar_tiempos(self.time_stamps[seleccion])
+
+    # --- Geometria ---
+    @property
+    def polyline_info(self):
+        return self.dataset(RUTA_SECCIONES + '/Polyline Info')
+
+    @property
+    def polyline_points(self):
+        return self.dataset(RUTA_SECCIONES + '/Polyline Points')
+
+    @property
+    def station_elevation_info(self):
+        return self.dataset(RUTA_SECCIONES + '/Station Elevation Info')
+
+    @property
+    def station_elevation_values(self):
+        return self.dataset(RUTA_SECCIONES + '/Station Elevation Values')
+
+    def polilinea(self, seccion):
+        # Puntos (x, y) de una seccion; Polyline Info = [inicio, cantidad, ...]
+        inicio, cantidad = self.polyline_info[seccion][:2]
+        return self.polyline_points[inicio:inicio + cantidad]
+
+    def polilineas(self):
+        info = self.polyline_info[:, :2]
+        puntos = self.polyline_points[()]
+        return [puntos[inicio:inicio + cantidad] for inicio, cantidad in info]
+
+    # --- Resumen ---
+    def resumen_attrs(self):
+        # Atributos crudos de Results/Unsteady/Summary (sin decodificar valores)
+        return self.archivo[RUTA_RESUMEN].attrs
+
+    @medido('hdf.atributos')
+    def resumen(self):
+        # Atributos del resumen como {nombre: texto}
+        return {decodificar(k): decodificar(v).strip() if isinstance(v, bytes) else v
+                for k, v in self.resumen_attrs().items()}
+
+
+def mapear_planes(funcion, rutas, procesos=None, hilos=False):
+    # Aplica funcion(ruta) a cada plan en paralelo y devuelve los resultados
+    # en el mismo orden que rutas. h5py serializa las llamadas entre hilos,
+    # por eso por defecto se usa un pool de procesos.
+    rutas = list(rutas)
+    with etapa('planes.mapear'):
+        if procesos == 1 or len(rutas) <= 1:
+            return [funcion(ruta) for ruta in rutas]
+        pool = ThreadPoolExecutor if hilos else ProcessPoolExecutor
+        with pool(max_workers=procesos) as ejecutor:
+            return list(ejecutor.map(funcion, rutas))
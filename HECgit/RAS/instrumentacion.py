@@ -0,0 +1,251 @@
+#instrumentacion opcional: tiempo por etapa, bytes leidos por dataset, llamadas h5py y pico de memoria
+# Se activa con la variable de entorno RAS_PERFIL=reporte.json (o activar()
+# / 'ras.py --perfil reporte.json'). Al terminar se escriben reporte.json y
+# reporte.folded (pilas colapsadas en microsegundos para flamegraph.pl o
+# speedscope). Sin activar, etapa() y medido() no agregan costo apreciable.
+import atexit
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from functools import wraps
+from multiprocessing import util
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+VARIABLE_ENTORNO = 'RAS_PERFIL'
+VARIABLE_PADRE = 'RAS_PERFIL_PADRE'
+RAIZ = 'ras'
+
+activa = False
+_ruta = None
+_pid = None
+_inicio = None
+_bloqueo = threading.Lock()
+_local = threading.local()
+_etapas = {}      # pila 'a;b;c' -> [llamadas, total_s, hijos_s]
+_lecturas = {}    # ruta del dataset -> [llamadas, bytes]
+_llamadas = {}    # llamada h5py -> cantidad
+_originales = {}
+_NADA = nullcontext()
+
+
+def _reiniciar():
+    # Estado propio del proceso (un proceso hijo creado por fork hereda el del padre)
+    global _pid, _inicio
+    _pid = os.getpid()
+    _inicio = time.perf_counter()
+    _etapas.clear()
+    _lecturas.clear()
+    _llamadas.clear()
+    _local.__dict__.clear()
+    if os.environ.get(VARIABLE_PADRE) != str(_pid):
+        # Proceso de un pool: el reporte parcial se escribe al terminar el proceso
+        util.Finalize(None, volcar, exitpriority=100)
+
+
+def _verificar_proceso():
+    if _pid != os.getpid():
+        _reiniciar()
+
+
+def _pila():
+    if not hasattr(_local, 'pila'):
+        nombre = threading.current_thread().name
+        _local.pila = [RAIZ if threading.current_thread() is threading.main_thread() else f'{RAIZ};{nombre}']
+    return _local.pila
+
+
+class _Etapa:
+    __slots__ = ('nombre', 'clave', 'desde')
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __enter__(self):
+        _verificar_proceso()
+        pila = _pila()
+        self.clave = f'{pila[-1]};{self.nombre}'
+        pila.append(self.clave)
+        self.desde = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duracion = time.perf_counter() - self.desde
+        pila = _pila()
+        pila.pop()
+        with _bloqueo:
+            registro = _etapas.setdefault(self.clave, [0, 0.0, 0.0])
+            registro[0] += 1
+            registro[1] += duracion
+            if len(pila) > 1:
+                _etapas.setdefault(pila[-1], [0, 0.0, 0.0])[2] += duracion
+
+
+def etapa(nombre):
+    # with etapa('hdf.abrir'): ...  (anidable; la pila forma el flamegraph)
+    return _Etapa(nombre) if activa else _NADA
+
+
+def medido(nombre):
+    # Decorador: la función completa es una etapa
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not activa:
+                return funcion(*args, **kwargs)
+            with _Etapa(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def _contar(llamada):
+    _verificar_proceso()
+    with _bloqueo:
+        _llamadas[llamada] = _llamadas.get(llamada, 0) + 1
+
+
+def _leer_dataset(dataset, *args, **kwargs):
+    datos = _originales['Dataset.__getitem__'](dataset, *args, **kwargs)
+    _contar('Dataset.__getitem__')
+    with _bloqueo:
+        registro = _lecturas.setdefault(dataset.name, [0, 0])
+        registro[0] += 1
+        registro[1] += getattr(datos, 'nbytes', 0)
+    return datos
+
+
+def _abrir_archivo(archivo, nombre, *args, **kwargs):
+    # h5py también crea objetos File a partir de identificadores abiertos
+    # (dataset.file); solo se cuentan las aperturas por ruta
+    if not isinstance(nombre, (str, bytes, os.PathLike)):
+        return _originales['File.__init__'](archivo, nombre, *args, **kwargs)
+    _contar('File')
+    with etapa('h5py.File'):
+        _originales['File.__init__'](archivo, nombre, *args, **kwargs)
+
+
+def _leer_atributo(atributos, nombre):
+    _contar('attrs.__getitem__')
+    return _originales['attrs.__getitem__'](atributos, nombre)
+
+
+def _instrumentar_h5py():
+    # Cuenta las aperturas, lecturas de datasets (con bytes por ruta) y de
+    # atributos hechas por cualquier módulo, no solo por PlanHDF
+    if _originales:
+        return
+    import h5py
+    _originales['Dataset.__getitem__'] = h5py.Dataset.__getitem__
+    _originales['File.__init__'] = h5py.File.__init__
+    _originales['attrs.__getitem__'] = h5py.AttributeManager.__getitem__
+    h5py.Dataset.__getitem__ = _leer_dataset
+    h5py.File.__init__ = _abrir_archivo
+    h5py.AttributeManager.__getitem__ = _leer_atributo
+
+
+def activar(ruta):
+    # Activa la instrumentación de este proceso y de los procesos que cree
+    global activa, _ruta
+    if activa:
+        return
+    _ruta = os.path.abspath(ruta)
+    os.environ[VARIABLE_ENTORNO] = _ruta
+    os.environ.setdefault(VARIABLE_PADRE, str(os.getpid()))
+    activa = True
+    _reiniciar()
+    _instrumentar_h5py()
+    if os.environ[VARIABLE_PADRE] == str(os.getpid()):
+        atexit.register(volcar)
+
+
+def pico_rss_mb():
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa KiB; macOS, bytes
+        return pico / 2 ** 20 if sys.platform == 'darwin' else pico / 2 ** 10
+    if psutil is not None:
+        memoria = psutil.Process().memory_info()
+        return getattr(memoria, 'peak_wset', memoria.rss) / 2 ** 20
+    return None
+
+
+def _reporte():
+    with _bloqueo:
+        return {
+            'pid': os.getpid(),
+            'duracion_s': time.perf_counter() - _inicio,
+            'pico_rss_mb': pico_rss_mb(),
+            'etapas': {pila: {'llamadas': n, 'total_s': total, 'propio_s': max(total - hijos, 0.0)}
+                       for pila, (n, total, hijos) in _etapas.items()},
+            'lecturas': {ruta: {'llamadas': n, 'bytes': b} for ruta, (n, b) in _lecturas.items()},
+            'llamadas_h5py': dict(_llamadas),
+        }
+
+
+def _combinar(reporte, parcial):
+    # Suma el reporte de un proceso del pool; sus pilas cuelgan de 'ras;workers'
+    for pila, valores in parcial['etapas'].items():
+        pila = pila.replace(RAIZ, f'{RAIZ};workers', 1)
+        destino = reporte['etapas'].setdefault(pila, {'llamadas': 0, 'total_s': 0.0, 'propio_s': 0.0})
+        for clave in destino:
+            destino[clave] += valores[clave]
+    for ruta, valores in parcial['lecturas'].items():
+        destino = reporte['lecturas'].setdefault(ruta, {'llamadas': 0, 'bytes': 0})
+        for clave in destino:
+            destino[clave] += valores[clave]
+    for llamada, n in parcial['llamadas_h5py'].items():
+        reporte['llamadas_h5py'][llamada] = reporte['llamadas_h5py'].get(llamada, 0) + n
+    reporte['workers'].append({'pid': parcial['pid'], 'duracion_s': parcial['duracion_s'],
+                               'pico_rss_mb': parcial['pico_rss_mb']})
+
+
+def pilas_colapsadas(etapas):
+    # Formato 'a;b;c valor' (tiempo propio en microsegundos) de flamegraph.pl
+    return [f'{pila} {round(valores["propio_s"] * 1e6)}' for pila, valores in sorted(etapas.items())
+            if valores['propio_s'] > 0]
+
+
+def volcar():
+    # Escribe el reporte. Un proceso del pool deja un parcial que el proceso
+    # principal combina al terminar.
+    if not activa or _pid != os.getpid():
+        return
+    reporte = _reporte()
+    if os.environ.get(VARIABLE_PADRE) != str(os.getpid()):
+        with open(f'{_ruta}.{os.getpid()}.parcial', 'w', encoding='utf-8') as archivo:
+            json.dump(reporte, archivo)
+        return
+
+    reporte['comando'] = sys.argv
+    reporte['fecha'] = datetime.now().isoformat(timespec='seconds')
+    reporte['workers'] = []
+    for parcial in sorted(glob.glob(f'{glob.escape(_ruta)}.*.parcial')):
+        with open(parcial, encoding='utf-8') as archivo:
+            _combinar(reporte, json.load(archivo))
+        os.remove(parcial)
+    reporte['etapas'] = dict(sorted(reporte['etapas'].items(), key=lambda e: -e[1]['total_s']))
+    reporte['lecturas'] = dict(sorted(reporte['lecturas'].items(), key=lambda e: -e[1]['bytes']))
+
+    with open(_ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(reporte, archivo, indent=2, ensure_ascii=False)
+    with open(os.path.splitext(_ruta)[0] + '.folded', 'w', encoding='utf-8') as archivo:
+        archivo.write('\n'.join(pilas_colapsadas(reporte['etapas'])) + '\n')
+    print(f"📊 Perfil guardado en {_ruta}", file=sys.stderr)
+
+
+if os.environ.get(VARIABLE_ENTORNO):
+    activar(os.environ[VARIABLE_ENTORNO])
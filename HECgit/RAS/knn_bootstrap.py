@@ -0,0 +1,105 @@
+#motor KNN bootstrap vectorizado para generar series sinteticas de caudal/nivel
+import bisect
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+
+from instrumentacion import etapa, medido
+
+
+@medido('knn.vecinos')
+def construir_tabla_knn(estados, k=5, eps=1e-10):
+    # estados: array (n, 2) estandarizado. El sucesor del estado i es siempre
+    # el estado i + 1, asi que los vecinos se buscan entre estados[:-1] y se
+    # calculan una sola vez para todos los estados historicos.
+    estados = np.asarray(estados, dtype=float)
+    knn = NearestNeighbors(n_neighbors=k)
+    knn.fit(estados[:-1])
+    distancias, indices = knn.kneighbors(estados)
+
+    # Pesos por distancia inversa, igual que en el bucle original
+    pesos = 1 / (distancias + eps)
+    pesos /= pesos.sum(axis=1, keepdims=True)
+    pesos_acum = np.cumsum(pesos, axis=1)
+    pesos_acum[:, -1] = 1.0
+    return indices, pesos_acum
+
+
+def _caminar(tabla, acumulados, sorteos, estado, salida):
+    for t, u in enumerate(sorteos):
+        j = bisect.bisect_right(acumulados[estado], u)
+        estado = tabla[estado][j] + 1
+        salida[t] = estado
+    return estado
+
+
+@medido('knn.caminata')
+def simular_indices(indices, pesos_acum, n_pasos, inicio=None, rng=None):
+    # Caminata de Markov como saltos de indice: devuelve, para cada dia
+    # sintetico, el indice del estado historico elegido.
+    if rng is None:
+        rng = np.random.default_rng()
+    if inicio is None:
+        inicio = len(indices) - 1
+
+    salida = np.empty(n_pasos, dtype=np.int64)
+    _caminar(indices.tolist(), pesos_acum.tolist(), rng.random(n_pasos).tolist(), inicio, salida)
+    return salida
+
+
+def iterar_simulacion(indices, pesos_acum, n_pasos, tam_bloque=3650, inicio=None, rng=None):
+    # Igual que simular_indices pero entrega la caminata en bloques de
+    # tam_bloque dias, para escribir la salida a medida que se genera.
+    if rng is None:
+        rng = np.random.default_rng()
+    estado = len(indices) - 1 if inicio is None else inicio
+    tabla = indices.tolist()
+    acumulados = pesos_acum.tolist()
+
+    for desde in range(0, n_pasos, tam_bloque):
+        n = min(tam_bloque, n_pasos - desde)
+        bloque = np.empty(n, dtype=np.int64)
+        with etapa('knn.caminata'):
+            estado = _caminar(tabla, acumulados, rng.random(n).tolist(), estado, bloque)
+        yield bloque
+
+
+# Tablas compartidas por cada proceso del pool (se envian una vez por proceso)
+_tablas_worker = None
+
+
+def _iniciar_worker(indices, pesos_acum):
+    global _tablas_worker
+    _tablas_worker = (indices, pesos_acum)
+
+
+def _realizacion(args):
+    semilla, n_pasos, inicio = args
+    indices, pesos_acum = _tablas_worker
+    rng = np.random.default_rng(semilla)
+    return simular_indices(indices, pesos_acum, n_pasos, inicio, rng).astype(np.int32)
+
+
+def generar_ensamble(indices, pesos_acum, valores, n_realizaciones, n_pasos,
+                     inicio=None, semilla=None, procesos=None):
+    # Genera n_realizaciones independientes en paralelo. Cada realizacion usa
+    # su propio generador derivado de SeedSequence(semilla), de modo que el
+    # ensamble es reproducible sin importar el numero de procesos.
+    # Devuelve un array (realizacion x dia x variable).
+    valores = np.asarray(valores)
+    hijos = np.random.SeedSequence(semilla).spawn(n_realizaciones)
+    tareas = [(hijo, n_pasos, inicio) for hijo in hijos]
+
+    salida = np.empty((n_realizaciones, n_pasos, valores.shape[1]), dtype=valores.dtype)
+    if procesos == 1 or n_realizaciones == 1:
+        _iniciar_worker(indices, pesos_acum)
+        for r, tarea in enumerate(tareas):
+            salida[r] = valores[_realizacion(tarea)]
+        return salida
+
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_worker,
+                             initargs=(indices, pesos_acum)) as pool:
+        for r, estados in enumerate(pool.map(_realizacion, tareas)):
+            salida[r] = valores[estados]
+    return salida
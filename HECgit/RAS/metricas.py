@@ -0,0 +1,118 @@
+#metricas de ajuste de perfiles simulados contra perfiles observados
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from hdf_plan import PlanHDF, mapear_planes
+from instrumentacion import medido
+
+
+@medido('metricas.puntuar')
+def puntuar_perfiles(simulados, observados):
+    # simulados: (planes x secciones); observados: (levantamientos x secciones)
+    # o un solo perfil. Devuelve {metrica: array (levantamientos x planes)}
+    # calculado en una sola pasada. Las secciones con NaN se ignoran.
+    sim = np.asarray(simulados, dtype=float)[None, :, :]
+    obs = np.atleast_2d(np.asarray(observados, dtype=float))[:, None, :]
+
+    validos = ~(np.isnan(sim) | np.isnan(obs))
+    n = validos.sum(axis=-1)
+    sim = np.where(validos, sim, 0.0)
+    obs = np.where(validos, obs, 0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        error = sim - obs
+        media_sim = sim.sum(axis=-1) / n
+        media_obs = obs.sum(axis=-1) / n
+        anom_sim = np.where(validos, sim - media_sim[..., None], 0.0)
+        anom_obs = np.where(validos, obs - media_obs[..., None], 0.0)
+
+        sd_sim = np.sqrt((anom_sim ** 2).sum(axis=-1) / n)
+        sd_obs = np.sqrt((anom_obs ** 2).sum(axis=-1) / n)
+        r = (anom_sim * anom_obs).sum(axis=-1) / n / (sd_sim * sd_obs)
+
+        metricas = {
+            'RMSE': np.sqrt((error ** 2).sum(axis=-1) / n),
+            'Sesgo': error.sum(axis=-1) / n,
+            'r': r,
+            'NSE': 1 - (error ** 2).sum(axis=-1) / (anom_obs ** 2).sum(axis=-1),
+            'KGE': 1 - np.sqrt((r - 1) ** 2 + (sd_sim / sd_obs - 1) ** 2 + (media_sim / media_obs - 1) ** 2),
+        }
+    return metricas
+
+
+def tabla_metricas(metodos, levantamientos, metricas):
+    # Pasa el resultado de puntuar_perfiles a una tabla larga
+    # (una fila por levantamiento y método)
+    n_lev, n_planes = metricas['RMSE'].shape
+    tabla = pd.DataFrame({
+        'Año observado': np.repeat(list(levantamientos), n_planes),
+        'Método': np.tile(list(metodos), n_lev),
+    })
+    for nombre, valores in metricas.items():
+        tabla[nombre] = valores.ravel()
+    return tabla
+
+
+def fecha_levantamiento(clave):
+    # Claves de levantamiento: año (int) o fecha 'AAAA-MM-DD'. Sin fecha
+    # exacta se toma la mitad del año.
+    if isinstance(clave, (int, np.integer)):
+        return np.datetime64(f'{clave}-07-01', 's')
+    return np.datetime64(clave, 's')
+
+
+def levantamiento_mas_cercano(tiempos, fechas_levantamiento):
+    # Índice del levantamiento más cercano en el tiempo a cada paso
+    # (fechas_levantamiento ordenadas)
+    fechas = np.asarray(fechas_levantamiento, dtype='datetime64[s]')
+    if len(fechas) == 1:
+        return np.zeros(len(tiempos), dtype=np.int64)
+    puntos_medios = fechas[:-1] + (fechas[1:] - fechas[:-1]) / 2
+    return np.searchsorted(puntos_medios, tiempos)
+
+
+@medido('metricas.curva_errores')
+def curva_errores(ruta, levantamientos, tam_bloque=512):
+    # Error de cada paso de tiempo guardado de Invert Elevation contra el
+    # levantamiento más cercano. El dataset se recorre por bloques de
+    # tam_bloque filas, de modo que la memoria no depende del largo de la corrida.
+    claves = sorted(levantamientos, key=fecha_levantamiento)
+    fechas = np.array([fecha_levantamiento(c) for c in claves])
+    observados = np.vstack([np.asarray(levantamientos[c], dtype=float) for c in claves])
+
+    with PlanHDF(ruta) as plan:
+        tiempos = plan.tiempos()
+        cercano = levantamiento_mas_cercano(tiempos, fechas)
+        rmse = np.empty(len(tiempos))
+        sesgo = np.empty(len(tiempos))
+        for desde, bloque in plan.invert_elevation.bloques(tam_bloque):
+            hasta = desde + len(bloque)
+            error = bloque - observados[cercano[desde:hasta]]
+            rmse[desde:hasta] = np.sqrt(np.nanmean(error ** 2, axis=1))
+            sesgo[desde:hasta] = np.nanmean(error, axis=1)
+
+    return pd.DataFrame({
+        'Fecha': tiempos,
+        'Levantamiento': np.asarray(claves, dtype=object)[cercano],
+        'RMSE': rmse,
+        'Sesgo': sesgo,
+    })
+
+
+def _curva_errores_plan(ruta, levantamientos, tam_bloque):
+    try:
+        return curva_errores(ruta, levantamientos, tam_bloque)
+    except Exception as e:
+        print(f"❌ Error en archivo {ruta}: {e}")
+        return None
+
+
+def curvas_errores(rutas, levantamientos, tam_bloque=512, procesos=None):
+    # curva_errores de varios planes en paralelo: {ruta: tabla por paso de
+    # tiempo}. Los planes que no se pueden leer se informan y se omiten.
+    rutas = list(rutas)
+    curvas = mapear_planes(partial(_curva_errores_plan, levantamientos=levantamientos, tam_bloque=tam_bloque),
+                           rutas, procesos)
+    return {ruta: curva for ruta, curva in zip(rutas, curvas) if curva is not None}
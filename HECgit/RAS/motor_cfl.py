@@ -0,0 +1,118 @@
+#analisis de CFL por seccion y por paso de tiempo a partir de la geometria real
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from hdf_plan import PlanHDF
+from instrumentacion import medido
+
+G = 9.81
+PERCENTILES = (50, 95, 99)
+
+
+def _segmentos(info):
+    # Info de HEC-RAS: [inicio, cantidad, ...] por seccion -> (inicios, cantidades, id de seccion por punto)
+    inicios = info[:, 0].astype(np.int64)
+    cantidades = info[:, 1].astype(np.int64)
+    seccion = np.repeat(np.arange(len(info)), cantidades)
+    return inicios, cantidades, seccion
+
+
+@medido('cfl.talwegs')
+def talwegs(plan):
+    # Talweg real de cada sección: punto de mínima cota de Station Elevation,
+    # ubicado en planta sobre la polilínea de la sección.
+    inicios, cantidades, seccion = _segmentos(plan.station_elevation_info[()])
+    sta_elev = plan.station_elevation_values[()]
+    estacion, cota = sta_elev[:, 0], sta_elev[:, 1]
+
+    # Primer punto de mínima cota de cada sección
+    cota_min = np.minimum.reduceat(cota, inicios)
+    candidatos = np.flatnonzero(cota == cota_min[seccion])
+    _, primero = np.unique(seccion[candidatos], return_index=True)
+    idx_min = candidatos[primero]
+
+    # Fracción de la sección (en estaciones) donde está el talweg
+    est_ini = estacion[inicios]
+    est_fin = estacion[inicios + cantidades - 1]
+    ancho = np.where(est_fin > est_ini, est_fin - est_ini, 1.0)
+    fraccion = (estacion[idx_min] - est_ini) / ancho
+
+    # Misma fracción medida a lo largo de la polilínea
+    p_inicios, p_cantidades, p_seccion = _segmentos(plan.polyline_info[()])
+    puntos = plan.polyline_points[()]
+    largo_tramo = np.hypot(*np.diff(puntos, axis=0).T)
+    largo_tramo[np.diff(p_seccion) != 0] = 0.0  # sin tramo entre secciones
+    acumulado = np.concatenate([[0.0], np.cumsum(largo_tramo)])
+    largo = acumulado[p_inicios + p_cantidades - 1] - acumulado[p_inicios]
+    objetivo = acumulado[p_inicios] + fraccion * largo
+
+    i = np.searchsorted(acumulado, objetivo, side='right') - 1
+    i = np.clip(i, p_inicios, np.maximum(p_inicios, p_inicios + p_cantidades - 2))
+    siguiente = np.minimum(i + 1, p_inicios + p_cantidades - 1)
+    tramo = acumulado[siguiente] - acumulado[i]
+    t = np.divide(objetivo - acumulado[i], tramo, out=np.zeros_like(tramo), where=tramo > 0)
+    xy = puntos[i] + t[:, None] * (puntos[siguiente] - puntos[i])
+    return xy, cota_min
+
+
+def distancias_talweg(xy):
+    # Distancia entre talwegs consecutivos; cada sección toma la menor de sus
+    # dos distancias vecinas, que es la que limita la estabilidad
+    d = np.hypot(*np.diff(xy, axis=0).T)
+    if len(d) == 0:
+        return np.full(len(xy), np.nan)
+    return np.minimum(np.concatenate([d[:1], d]), np.concatenate([d, d[-1:]]))
+
+
+@medido('cfl.analizar')
+def analizar_cfl(ruta, tam_bloque=1024):
+    # Número de Courant c*dt/dx (c = sqrt(g*h)) para cada sección y cada paso
+    # de tiempo guardado. Devuelve (tabla por sección, resumen global).
+    with PlanHDF(ruta) as plan:
+        tiempo = plan.computation_time[:2]
+        dt = float(tiempo[1] - tiempo[0]) * 24 * 3600
+        xy, cota_talweg = talwegs(plan)
+        dx = distancias_talweg(xy)
+        tiempos = plan.tiempos()
+
+        profundidad = plan.effective_depth
+        cfl = np.empty(profundidad.shape, dtype=np.float32)
+        for desde, bloque in profundidad.bloques(tam_bloque):
+            celeridad = np.sqrt(G * np.clip(bloque, 0, None))
+            cfl[desde:desde + len(bloque)] = celeridad * dt / dx
+
+    # Secciones sin ningún valor (distancia o profundidad NaN en todos los
+    # pasos) quedan con NaN en lugar de hacer fallar nanargmax
+    validas = ~np.isnan(cfl).all(axis=0)
+    peor = np.zeros(cfl.shape[1], dtype=np.int64)
+    peor[validas] = np.nanargmax(cfl if validas.all() else cfl[:, validas], axis=0)
+    cfl_max = np.where(validas, cfl[peor, np.arange(cfl.shape[1])], np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        percentiles = np.nanpercentile(cfl, PERCENTILES, axis=0)
+    fecha_max = np.where(validas, tiempos[peor], np.datetime64('NaT', 's'))
+
+    tabla = pd.DataFrame({
+        "Sección": np.arange(1, cfl.shape[1] + 1),
+        "Cota talweg (m)": cota_talweg,
+        "Distancia (m)": dx,
+        "CFL máx": cfl_max,
+        **{f"CFL P{p}": v for p, v in zip(PERCENTILES, percentiles)},
+        "Fecha CFL máx": fecha_max,
+        # Mayor dt que mantiene CFL <= 1 en la sección
+        "dt estable (s)": dt / cfl_max.astype(float),
+    })
+    if not validas.any():
+        return tabla, {"dt (s)": dt, "CFL máx": np.nan, "Sección crítica": None,
+                       "Fecha crítica": np.datetime64('NaT', 's'), "dt máximo estable (s)": np.nan}
+    peor_seccion = int(np.nanargmax(cfl_max))
+    resumen = {
+        "dt (s)": dt,
+        "CFL máx": float(cfl_max[peor_seccion]),
+        "Sección crítica": peor_seccion + 1,
+        "Fecha crítica": fecha_max[peor_seccion],
+        "dt máximo estable (s)": float(np.nanmin(tabla["dt estable (s)"])),
+    }
+    return tabla, resumen
@@ -0,0 +1,99 @@
+#seleccion de pasos de tiempo (frames) sobre el indice datetime64 de las series de sedimentos
+import numpy as np
+
+# Reglas de seleccion de seleccionar_indices
+REGLAS = ('uniforme', 'anual', 'mensual', 'paso', 'picos')
+
+
+def anios(tiempos):
+    # datetime64 -> año (int)
+    return np.asarray(tiempos, dtype='datetime64[Y]').astype(np.int64) + 1970
+
+
+def indice_mas_cercano(tiempos, fechas):
+    # Índice del paso más cercano a cada fecha (tiempos ordenados), por búsqueda binaria
+    fechas = np.asarray(fechas, dtype='datetime64[s]')
+    derecha = np.clip(np.searchsorted(tiempos, fechas), 1, len(tiempos) - 1)
+    izquierda = derecha - 1
+    mas_cerca_izq = (fechas - tiempos[izquierda]) <= (tiempos[derecha] - fechas)
+    return np.where(mas_cerca_izq, izquierda, derecha)
+
+
+def rango_fechas(tiempos, inicio=None, fin=None):
+    # slice de los pasos con inicio <= t <= fin
+    desde = 0 if inicio is None else int(np.searchsorted(tiempos, np.datetime64(inicio, 's'), side='left'))
+    hasta = len(tiempos) if fin is None else int(np.searchsorted(tiempos, np.datetime64(fin, 's'), side='right'))
+    return slice(desde, hasta)
+
+
+def indices_uniformes(n, cantidad):
+    # cantidad índices equiespaciados, incluyendo el primero y el último
+    return np.unique(np.linspace(0, n - 1, cantidad, dtype=int))
+
+
+def indices_calendario(tiempos, periodo='Y'):
+    # Primer paso de cada año ('Y') o mes ('M') calendario
+    inicio = tiempos[0].astype(f'datetime64[{periodo}]')
+    fin = tiempos[-1].astype(f'datetime64[{periodo}]')
+    cortes = np.arange(inicio, fin + 1).astype('datetime64[s]')
+    return np.unique(np.searchsorted(tiempos, cortes))
+
+
+def indices_cada(tiempos, paso):
+    # Paso más cercano a t0, t0 + paso, t0 + 2 paso, ... (paso: timedelta64)
+    objetivos = np.arange(tiempos[0], tiempos[-1] + paso, paso)
+    return np.unique(indice_mas_cercano(tiempos, objetivos))
+
+
+def indices_picos(serie, cantidad=None, umbral=None, separacion=1):
+    # Máximos locales de la serie (eventos), de mayor a menor, separados al
+    # menos por separacion pasos; se devuelven ordenados en el tiempo
+    serie = np.asarray(serie, dtype=float)
+    if len(serie) < 3:
+        return np.array([int(np.nanargmax(serie))]) if len(serie) else np.array([], dtype=int)
+    centro = serie[1:-1]
+    picos = np.flatnonzero((centro > serie[:-2]) & (centro >= serie[2:])) + 1
+    if umbral is not None:
+        picos = picos[serie[picos] >= umbral]
+    elegidos = []
+    for p in picos[np.argsort(serie[picos])[::-1]]:
+        if all(abs(p - e) >= separacion for e in elegidos):
+            elegidos.append(p)
+            if cantidad is not None and len(elegidos) == cantidad:
+                break
+    return np.sort(np.array(elegidos, dtype=int))
+
+
+def variacion_media(dataset, tam_bloque=1024):
+    # Cambio medio absoluto entre pasos consecutivos (p.ej. del Invert
+    # Elevation), calculado por bloques; sirve como serie de eventos
+    variacion = np.zeros(len(dataset))
+    anterior = None
+    for desde, bloque in dataset.bloques(tam_bloque):
+        # variacion[i] = cambio entre i-1 e i; el primer paso queda en 0
+        if anterior is None:
+            filas, inicio = bloque, desde + 1
+        else:
+            filas, inicio = np.vstack([anterior, bloque]), desde
+        variacion[inicio:desde + len(bloque)] = np.nanmean(np.abs(np.diff(filas, axis=0)), axis=1)
+        anterior = bloque[-1:]
+    return variacion
+
+
+def seleccionar_indices(tiempos, regla='uniforme', cantidad=20, paso=None, serie=None, umbral=None,
+                        separacion=1):
+    # Índices de los frames según la regla; siempre incluye el primer y el último paso
+    n = len(tiempos)
+    if regla == 'uniforme':
+        indices = indices_uniformes(n, cantidad)
+    elif regla == 'anual':
+        indices = indices_calendario(tiempos, 'Y')
+    elif regla == 'mensual':
+        indices = indices_calendario(tiempos, 'M')
+    elif regla == 'paso':
+        indices = indices_cada(tiempos, paso)
+    elif regla == 'picos':
+        indices = indices_picos(serie, cantidad, umbral, separacion)
+    else:
+        raise ValueError(f"Regla de selección desconocida: {regla} (opciones: {', '.join(REGLAS)})")
+    return np.unique(np.concatenate([[0], indices, [n - 1]])).astype(int)
@@ -0,0 +1,121 @@
+#capas de la vista en planta: contorno del embalse cacheado y nube de puntos decimada por zoom
+import os
+
+import numpy as np
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.path import Path
+
+
+def _anillos(geometria):
+    # Partes de una geometría shapely como (anillos del polígono, es_poligono)
+    tipo = geometria.geom_type
+    if tipo.startswith('Multi') or tipo == 'GeometryCollection':
+        for parte in geometria.geoms:
+            yield from _anillos(parte)
+    elif tipo == 'Polygon':
+        yield [np.asarray(geometria.exterior.coords)] + [np.asarray(h.coords) for h in geometria.interiors], True
+    elif tipo in ('LineString', 'LinearRing'):
+        yield [np.asarray(geometria.coords)], False
+
+
+def simplificar_contorno(shapefile_path, ruta_cache, tolerancia):
+    # Lee el shapefile (geopandas solo se importa aquí), simplifica la
+    # geometría y guarda los vértices en un .npz:
+    # puntos, inicio de cada anillo, parte de cada anillo y si la parte es polígono
+    import geopandas as gpd
+
+    gdf = gpd.read_file(shapefile_path)
+    geometrias = gdf.geometry.simplify(tolerancia, preserve_topology=True) if tolerancia else gdf.geometry
+    anillos, parte_anillo, es_poligono = [], [], []
+    for geometria in geometrias.dropna():
+        for partes, poligono in _anillos(geometria):
+            anillos += [a[:, :2] for a in partes]
+            parte_anillo += [len(es_poligono)] * len(partes)
+            es_poligono.append(poligono)
+    inicios = np.cumsum([0] + [len(a) for a in anillos])
+    puntos = np.concatenate(anillos) if anillos else np.empty((0, 2))
+    np.savez(ruta_cache, puntos=puntos, inicios=inicios, parte=np.array(parte_anillo, dtype=int),
+             es_poligono=np.array(es_poligono, dtype=bool), tolerancia=tolerancia)
+
+
+class ContornoCacheado:
+    # Contorno del embalse simplificado una sola vez y convertido a Paths de
+    # matplotlib; cada refresco solo agrega una colección ya armada, sin
+    # pasar por geopandas ni shapely.
+    def __init__(self, shapefile_path, tolerancia=10.0, ruta_cache=None):
+        if ruta_cache is None:
+            ruta_cache = os.path.splitext(shapefile_path)[0] + '_simplificado.npz'
+        if not self._cache_vigente(shapefile_path, ruta_cache, tolerancia):
+            print(f"Simplificando contorno {shapefile_path} (tolerancia {tolerancia})")
+            simplificar_contorno(shapefile_path, ruta_cache, tolerancia)
+
+        with np.load(ruta_cache) as datos:
+            puntos, inicios = datos['puntos'], datos['inicios']
+            parte, es_poligono = datos['parte'], datos['es_poligono']
+        anillos = [puntos[a:b] for a, b in zip(inicios[:-1], inicios[1:])]
+        self.poligonos = []
+        self.lineas = []
+        for i, poligono in enumerate(es_poligono):
+            partes = [anillos[j] for j in np.flatnonzero(parte == i)]
+            if poligono:
+                self.poligonos.append(Path.make_compound_path(*[Path(a, closed=True) for a in partes]))
+            else:
+                self.lineas += partes
+        self.extension = (puntos.min(axis=0), puntos.max(axis=0)) if len(puntos) else None
+
+    @staticmethod
+    def _cache_vigente(shapefile_path, ruta_cache, tolerancia):
+        if not os.path.exists(ruta_cache):
+            return False
+        if os.path.exists(shapefile_path) and os.path.getmtime(ruta_cache) < os.path.getmtime(shapefile_path):
+            return False
+        with np.load(ruta_cache) as datos:
+            return float(datos['tolerancia']) == float(tolerancia or 0)
+
+    def dibujar(self, ax, color='lightblue', edgecolor='black', alpha=0.5, label='Contorno Embalse'):
+        artistas = []
+        if self.poligonos:
+            artistas.append(PathCollection(self.poligonos, facecolor=color, edgecolor=edgecolor, alpha=alpha,
+                                           label=label))
+        if self.lineas:
+            artistas.append(LineCollection(self.lineas, colors=edgecolor, alpha=alpha,
+                                           label=None if self.poligonos else label))
+        for artista in artistas:
+            ax.add_collection(artista, autolim=False)
+        if self.extension is not None:
+            ax.update_datalim(np.array(self.extension))
+            ax.autoscale_view()
+        return artistas
+
+
+class PuntosDecimados:
+    # Nube de puntos con nivel de detalle según el zoom: solo se dibujan los
+    # puntos dentro de la vista actual y, si son más que max_puntos, una
+    # muestra fija (cada punto tiene un rango aleatorio; se muestran los de
+    # menor rango), de modo que al acercarse aparece más detalle.
+    def __init__(self, ax, x, y, max_puntos=50000, semilla=0, **kwargs):
+        self.ax = ax
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.max_puntos = max_puntos
+        self.orden = np.random.default_rng(semilla).permutation(len(self.x))
+        self.xy_orden = np.column_stack([self.x[self.orden], self.y[self.orden]])
+
+        self.artista = ax.scatter(*self.xy_orden[:max_puntos].T, **kwargs)
+        # Los límites se ajustan a la nube completa, no a la muestra
+        if len(self.x):
+            ax.update_datalim([(self.x.min(), self.y.min()), (self.x.max(), self.y.max())])
+            ax.autoscale_view()
+        self._conexiones = [ax.callbacks.connect(evento, self.actualizar)
+                            for evento in ('xlim_changed', 'ylim_changed')]
+
+    def actualizar(self, ax=None):
+        (x0, x1), (y0, y1) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        x, y = self.xy_orden[:, 0], self.xy_orden[:, 1]
+        visibles = np.flatnonzero((x >= x0) & (x <= x1) & (y >= y0) & (y <= y1))[:self.max_puntos]
+        self.artista.set_offsets(self.xy_orden[visibles])
+
+    def desconectar(self):
+        for conexion in self._conexiones:
+            self.ax.callbacks.disconnect(conexion)
+        self._conexiones = []
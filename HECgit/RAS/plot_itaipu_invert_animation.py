@@ -1,188 +1,91 @@
-import h5py
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # Usar backend no interactivo
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-from datetime import datetime
 from PIL import Image
-import cv2
 import numpy as np
-import os
+from hdf_plan import PlanHDF
+from animacion_invert import planificar_frames, renderizar_frames, AnimacionBlit
+from muestreo_tiempos import anios, seleccionar_indices, variacion_media
+from escritor_video import EscritorVideo
 
 # Plan definido directamente (Plan 1)
 hdf_file = r"C:\HECtest\Test.p27.hdf"
 plan_label = 'calibwithobstruction'
 color = 'brown'
 
-# Función para extraer el año de la fecha (formato "01JAN2011 01:00:00")
-def extract_year(timestamp):
-    try:
-        date = datetime.strptime(timestamp, '%d%b%Y %H:%M:%S')
-        return date.year
-    except ValueError:
-        print(f"Error al extraer el año de: {timestamp}")
-        return None
-
-# Procesar el plan y extraer fechas
-print(f"\nProcesando plan: {plan_label} ({hdf_file})")
-try:
-    with h5py.File(hdf_file, 'r') as f:
-        invert_elevation_data = \
-            f['Results']['Unsteady']['Output']['Output Blocks']['Sediment']['Sediment Time Series']['Cross Sections'][
-                'Invert Elevation']
-        time_data = f['Results']['Unsteady']['Output']['Output Blocks']['Sediment']['Sediment Time Series'][
-                        'Time Date Stamp'][:]
-        time_stamps = [str(t.decode('utf-8')) if isinstance(t, bytes) else str(t) for t in time_data]
-        plan_data = {'data': invert_elevation_data[:, :], 'label': plan_label, 'color': color, 'times': time_stamps}
-except Exception as e:
-    print(f"Error: {e}")
-    exit(1)
-
-# Verificar los años en los datos
-years = [extract_year(t) for t in plan_data['times'] if extract_year(t) is not None]
-print(f"Años cubiertos en los datos: {sorted(set(years))}")
-
-# Calcular 10 índices uniformemente distribuidos, incluyendo el primero y el último
+# Selección de frames (siempre incluye el primer y el último paso):
+# 'uniforme': num_intervals índices equiespaciados
+# 'anual' / 'mensual': primer paso de cada año / mes calendario
+# 'paso': cada paso_frames de tiempo
+# 'picos': los num_intervals mayores eventos de cambio del invert
+regla_frames = 'uniforme'
 num_intervals = 20
-data_length = len(plan_data['data'])
-uniform_indices = np.linspace(0, data_length - 1, num_intervals, dtype=int)
-print(f"Índices uniformes seleccionados: {uniform_indices.tolist()}")
-print("Marcas temporales seleccionadas:")
-for idx in uniform_indices:
-    print(f"Índice {idx}: {plan_data['times'][idx]} (Año: {extract_year(plan_data['times'][idx])})")
-
-observed_2018 = {
-    'Invert_Elevation': [193.08, 175.62, 182.37, 145.27, 128.01, 107.38, 76.50, 88.56, 85.25, 82.26, 78.73, 64.64,
-                         61.55, 76.38, 56.26, 67.76]
-}
-data_observed_2018 = pd.DataFrame(observed_2018)
-
-# Configurar la figura
-fig, ax = plt.subplots(figsize=(12, 8))
-ax.set_ylabel('Elevación del Invert (m)')
-ax.set_title('Cambio de Elevación del Invert a lo Largo del Tiempo - Guairá A-A')
-ax.grid(True)
-ax.invert_xaxis()
-ax.set_xticks([])
-
-# Línea para el plan (inicialmente vacía)
-line = ax.plot([], [], label=plan_data['label'], color=plan_data['color'], linestyle='-', marker='o')[0]
-# Línea para datos observados (estática)
-ax.plot(data_observed_2018['Invert_Elevation'], label='Observado 2018 (LG-01)', color='black', linestyle=':',
-        marker='o', linewidth=2)
-# Línea inicial (estática) para referencia
-initial_line = ax.plot(range(len(plan_data['data'][0])), plan_data['data'][0], label='Paso Inicial',
-                       color='gray', linestyle='--', linewidth=1)[0]
-
-# Dibujar la presa referencial en el lado derecho (trapezoidal)
-n_sections = len(plan_data['data'][0])  # Número de secciones transversales
-presa_x = [n_sections, n_sections - 0.20, n_sections - 0.30, n_sections - 0.5]  # Coordenadas X para un trapecio
-presa_y = [50, 225, 225, 50]  # Coordenadas Y (cota 50 a 225)
-ax.fill(presa_x, presa_y, color='gray', alpha=0.5, label='Presa Referencial')  # Relleno de la presa
-
-ax.legend()
-
-# Variable para el relleno (se actualizará en la animación)
-fill = None
-# Lista para almacenar las líneas de cada año (como tuplas: (año, línea))
-year_lines = []
-# Variable para rastrear el año anterior
-last_year = None
-
-# Función de inicialización
-def init():
-    global fill, last_year, year_lines
-    line.set_data([], [])
-    if fill is not None:
-        fill.remove()  # Eliminar el relleno anterior si existe
-    fill = ax.fill_between([], [], [], color='brown', alpha=0.3)  # Relleno inicial vacío
-    # Limpiar las líneas de años anteriores
-    for _, year_line in year_lines:
-        year_line.remove()
-    year_lines = []
-    last_year = None
-    return [line, fill] + [yl for _, yl in year_lines]
-
-# Función de animación con 10 intervalos uniformes
-def animate(frame):
-    global fill, last_year, year_lines
-    data_index = uniform_indices[frame]  # Usar índices uniformes
-    if data_index < len(plan_data['data']):
-        x = range(len(plan_data['data'][data_index]))
-        line.set_data(x, plan_data['data'][data_index])
-        if fill is not None:
-            fill.remove()
-        fill = ax.fill_between(x, plan_data['data'][0], plan_data['data'][data_index],
-                               color='brown', alpha=0.3, label='Depósito/Erosión')
-        current_time = plan_data['times'][data_index]
-        ax.set_title(f'Cambio de Elevación del Invert - {current_time}')
-
-        current_year = extract_year(current_time)
-        if current_year is not None:
-            if last_year is not None and current_year != last_year:
-                print(f"Registrando línea para el año {last_year} en índice {data_index}")
-                year_line = ax.plot(x, plan_data['data'][data_index], linestyle='-',
-                                    linewidth=1, alpha=0.5, label=f'Año {last_year}')[0]
-                year_lines.append((last_year, year_line))
-            last_year = current_year
-
-            # En el último frame, registrar la línea para el año actual (2100)
-            if frame == num_intervals - 1 and current_year is not None:
-                print(f"Registrando línea para el año {current_year} en índice {data_index} (último frame)")
-                year_line = ax.plot(x, plan_data['data'][data_index], linestyle='-',
-                                    linewidth=1, alpha=0.5, label=f'Año {current_year}')[0]
-                year_lines.append((current_year, year_line))
-
-        # Actualizar la leyenda en cada frame
-        ax.legend()
-
-        # Guardar el frame como PNG
-        output_png = f'frame_{frame}.png'
-        plt.savefig(output_png, dpi=300, bbox_inches='tight')
-        print(f"Guardado {output_png}")
-
-    return [line, fill] + [yl for _, yl in year_lines]
-
-# Crear la animación con 10 frames
-ani = FuncAnimation(fig, animate, frames=num_intervals, init_func=init, blit=False, interval=1000)  # Desactivar blit para PNGs
-
-# Guardar la animación como GIF
-output_gif = 'invert_elevation_animation_10_intervals_with_first_last.gif'
-ani.save(output_gif, writer='pillow', fps=1)  # 1 fps para que cada intervalo dure 1 segundo
-print(f"Animación guardada como {output_gif}")
-
-# Convertir GIF a MP4
-gif_path = 'invert_elevation_animation_10_intervals_with_first_last.gif'
+paso_frames = np.timedelta64(90, 'D')
+
+# Cada frame se rasteriza una sola vez (a esta resolución) y se escribe
+# directamente al MP4, al GIF y al PNG antes de pasar al siguiente
+dpi_frames = 150
+procesos = None  # None = todos los núcleos
+# 'paralelo': cada frame se dibuja completo en un proceso del pool
+# 'blit': un solo proceso, fondo estático cacheado y actualización incremental
+modo = 'paralelo'
+fps = 1  # 1 fps para que cada intervalo dure 1 segundo
+
+output_gif = 'invert_elevation_animation_10_intervals_with_first_last.gif'  # None = sin GIF
 mp4_path = 'invert_elevation_animation_10_intervals_with_first_last.mp4'
+guardar_png = True  # un PNG por frame
 
-# Abrir el GIF
-gif = Image.open(gif_path)
-
-# Obtener tamaño y frames
-width, height = gif.size
-frames = []
+observed_2018 = [193.08, 175.62, 182.37, 145.27, 128.01, 107.38, 76.50, 88.56, 85.25, 82.26, 78.73, 64.64,
+                 61.55, 76.38, 56.26, 67.76]
 
-# Extraer cada cuadro del GIF
-try:
-    while True:
-        frame = gif.convert('RGB')  # Convertir a formato RGB
-        frame_np = np.array(frame)
-        frame_bgr = cv2.cvtColor(frame_np, cv2.COLOR_RGB2BGR)  # Convertir a BGR para OpenCV
-        frames.append(frame_bgr)
-        gif.seek(gif.tell() + 1)
-except EOFError:
-    pass  # Fin del GIF
 
-# Crear el archivo de video
-fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Codec para MP4
-fps = 1  # 1 fps para coincidir con el GIF
-out = cv2.VideoWriter(mp4_path, fourcc, fps, (width, height))
-
-# Escribir cada frame
-for frame in frames:
-    out.write(frame)
-
-# Finalizar
-out.release()
-print(f"✅ GIF convertido exitosamente a MP4: {mp4_path}")
\ No newline at end of file
+def main():
+    # Procesar el plan y extraer fechas
+    print(f"\nProcesando plan: {plan_label} ({hdf_file})")
+    try:
+        with PlanHDF(hdf_file) as plan:
+            invert_elevation_data = plan.invert_elevation
+            # Índice temporal decodificado una sola vez
+            tiempos = plan.tiempos()
+            serie = variacion_media(invert_elevation_data) if regla_frames == 'picos' else None
+            indices = seleccionar_indices(tiempos, regla_frames, num_intervals, paso_frames, serie)
+            # Leer solo las filas y marcas de los frames (índices crecientes sin repetir)
+            filas = indices.tolist()
+            perfiles = dict(zip(filas, invert_elevation_data[filas]))
+            textos = dict(zip(filas, plan.tiempos_texto(filas)))
+    except Exception as e:
+        print(f"Error: {e}")
+        return
+
+    # Verificar los años en los datos
+    print(f"Años cubiertos en los datos: {np.unique(anios(tiempos)).tolist()}")
+
+    print(f"Índices seleccionados ({regla_frames}): {filas}")
+    print("Marcas temporales seleccionadas:")
+    for idx, anio in zip(filas, anios(tiempos[indices]).tolist()):
+        print(f"Índice {idx}: {textos[idx]} (Año: {anio})")
+
+    # Estado de cada frame calculado de antemano: los frames no dependen del
+    # frame anterior y se pueden dibujar en cualquier orden o proceso
+    frames = planificar_frames(indices, tiempos, textos)
+    contexto = {
+        'perfiles': perfiles, 'label': plan_label, 'color': color, 'dpi': dpi_frames,
+        'observado': observed_2018, 'label_observado': 'Observado 2018 (LG-01)',
+    }
+    if modo == 'blit':
+        rasterizados = AnimacionBlit(contexto, frames).iterar()
+    else:
+        rasterizados = renderizar_frames(contexto, frames, procesos)
+
+    with EscritorVideo(mp4_path, fps, output_gif) as video:
+        for frame, rgb in enumerate(rasterizados):
+            video.escribir(rgb)
+            if guardar_png:
+                output_png = f'frame_{frame}.png'
+                Image.fromarray(rgb).save(output_png, dpi=(dpi_frames, dpi_frames))
+                print(f"Guardado {output_png}")
+
+    if output_gif:
+        print(f"Animación guardada como {output_gif}")
+    print(f"✅ Video MP4 guardado: {mp4_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+#punto de entrada unico (subcomandos) para los scripts de analisis de planes HEC-RAS
+# Cada subcomando importa sus dependencias recién al ejecutarse: una consulta
+# rápida (p. ej. 'python ras.py summary Test.p45.hdf') no carga matplotlib,
+# cv2, PIL, sklearn, seaborn ni pandas.
+import argparse
+import glob
+import os
+import sys
+
+
+def _expandir(patrones):
+    # Expande comodines también en Windows (cmd no los expande)
+    rutas = []
+    for patron in patrones:
+        encontradas = sorted(glob.glob(patron))
+        rutas.extend(encontradas if encontradas else [patron])
+    return rutas
+
+
+def _configurar(modulo, **valores):
+    # Sobrescribe la configuración del script con los argumentos dados (None = la del script)
+    for nombre, valor in valores.items():
+        if valor is not None:
+            setattr(modulo, nombre, valor)
+    return modulo
+
+
+def comando_summary(args):
+    from tabulate import tabulate
+    from resumen_plan import COLUMNAS, process_hdf_file, procesar_planes
+
+    rutas = _expandir(args.planes)
+    if len(rutas) == 1 and args.cache is None:
+        # Un solo plan: sin pool ni pandas
+        filas = [process_hdf_file(rutas[0])]
+        tabla = [[fila[c] for c in COLUMNAS] for fila in filas]
+        print(tabulate(tabla, headers=COLUMNAS, floatfmt=".2f", tablefmt="grid"))
+    else:
+        resultados = procesar_planes(rutas, args.procesos, cache=args.cache)
+        print(tabulate(resultados, headers="keys", floatfmt=".2f", tablefmt="grid", showindex=False))
+
+
+def comando_sa(args):
+    import SA
+    if args.folder is not None and args.cache is None:
+        args.cache = os.path.join(args.folder, 'cache_planes.sqlite')
+    _configurar(SA, folder=args.folder, ruta_cache=args.cache, patron_planes=args.patron, plan_base=args.base)
+    SA.main()
+
+
+def comando_rmse(args):
+    import RMSEyCor
+    _configurar(RMSEyCor, hdf_files=_expandir(args.planes) if args.planes else None,
+                ruta_cache=args.cache, modo_historial=args.historial or None)
+    RMSEyCor.main()
+
+
+def comando_cfl(args):
+    import CFL
+    _configurar(CFL, hdf_path=args.plan)
+    CFL.main()
+
+
+def comando_animate(args):
+    import plot_itaipu_invert_animation as animacion
+    _configurar(animacion, hdf_file=args.plan, regla_frames=args.regla, num_intervals=args.frames,
+                modo=args.modo, fps=args.fps, mp4_path=args.mp4, output_gif=args.gif, procesos=args.procesos)
+    if args.sin_gif:
+        animacion.output_gif = None
+    animacion.main()
+
+
+def comando_knn(args):
+    import KNNbootstrapcaudales200anhos as knn_caudales
+    _configurar(knn_caudales, file_path=args.excel, n_realizaciones=args.realizaciones,
+                semilla=args.semilla, procesos=args.procesos)
+    knn_caudales.main()
+
+
+def comando_bathy(args):
+    if args.volumenes:
+        import VolumenesBatimetria as script
+        _configurar(script, procesos=args.procesos)
+    else:
+        import BatimetrisOPSH as script
+        _configurar(script, shapefile_path=args.shapefile)
+    _configurar(script, file_path=args.excel, store_path=args.almacen)
+    script.main()
+
+
+def comando_inspect(args):
+    if args.catalogo is not None:
+        import pandas as pd
+        from catalogo_hdf import CatalogoHDF
+        with CatalogoHDF(args.catalogo) as catalogo:
+            catalogo.actualizar(_expandir(args.planes), args.procesos)
+            with pd.option_context("display.width", 200, "display.max_columns", None,
+                                   "display.max_colwidth", 80, "display.max_rows", None):
+                if args.dataset is not None:
+                    print(catalogo.planes_con(args.dataset).to_string(index=False))
+                else:
+                    print(catalogo.buscar(args.buscar or '*').to_string(index=False))
+        return
+
+    for ruta in _expandir(args.planes):
+        if args.dataset is not None:
+            from scratch_9 import inspeccionar_dataset
+            inspeccionar_dataset(ruta, args.dataset)
+        elif args.grupos:
+            from scratch_10 import inspeccionar_grupos
+            inspeccionar_grupos(ruta, args.grupos)
+        else:
+            from scratch_8 import explore_hecras_hdf
+            explore_hecras_hdf(ruta)
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog='ras', description='Análisis de planes HEC-RAS (Test.pNN.hdf)')
+    parser.add_argument('--perfil', metavar='REPORTE.json',
+                        help='registrar tiempos por etapa, lecturas HDF y memoria (JSON + .folded para flamegraph)')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p = sub.add_parser('summary', help='masa/volumen de sedimentos y eficiencia de atrapamiento')
+    p.add_argument('planes', nargs='+', help='archivos .hdf (acepta comodines)')
+    p.add_argument('--cache', help='cache .sqlite de datos de planes')
+    p.add_argument('--procesos', type=int)
+    p.set_defaults(funcion=comando_summary)
+
+    p = sub.add_parser('sa', help='análisis de sensibilidad (SA.py)')
+    p.add_argument('--folder')
+    p.add_argument('--patron', help="patrón de planes, p. ej. 'Test.p*.hdf' (por defecto Test.p35 ... Test.p55)")
+    p.add_argument('--base', help='plan base sin perturbar (por defecto el que tiene todos los parámetros en su valor base)')
+    p.add_argument('--cache')
+    p.set_defaults(funcion=comando_sa)
+
+    p = sub.add_parser('rmse', help='RMSE y correlación contra levantamientos (RMSEyCor.py)')
+    p.add_argument('planes', nargs='*')
+    p.add_argument('--cache')
+    p.add_argument('--historial', action='store_true', help='puntuar cada paso de tiempo guardado')
+    p.set_defaults(funcion=comando_rmse)
+
+    p = sub.add_parser('cfl', help='número de Courant por sección y paso (CFL.py)')
+    p.add_argument('plan', nargs='?')
+    p.set_defaults(funcion=comando_cfl)
+
+    p = sub.add_parser('animate', help='animación del invert (plot_itaipu_invert_animation.py)')
+    p.add_argument('plan', nargs='?')
+    p.add_argument('--regla', choices=['uniforme', 'anual', 'mensual', 'paso', 'picos'])
+    p.add_argument('--frames', type=int)
+    p.add_argument('--modo', choices=['paralelo', 'blit'])
+    p.add_argument('--fps', type=float)
+    p.add_argument('--mp4')
+    p.add_argument('--gif')
+    p.add_argument('--sin-gif', action='store_true')
+    p.add_argument('--procesos', type=int)
+    p.set_defaults(funcion=comando_animate)
+
+    p = sub.add_parser('knn', help='caudales y niveles sintéticos por bootstrap KNN')
+    p.add_argument('--excel')
+    p.add_argument('--realizaciones', type=int)
+    p.add_argument('--semilla', type=int)
+    p.add_argument('--procesos', type=int)
+    p.set_defaults(funcion=comando_knn)
+
+    p = sub.add_parser('bathy', help='visor de batimetrías (o volúmenes con --volumenes)')
+    p.add_argument('--excel')
+    p.add_argument('--almacen', help='almacén .h5 de la batimetría')
+    p.add_argument('--shapefile')
+    p.add_argument('--volumenes', action='store_true', help='depósito/erosión entre levantamientos')
+    p.add_argument('--procesos', type=int)
+    p.set_defaults(funcion=comando_bathy)
+
+    p = sub.add_parser('inspect', help='estructura de archivos HDF')
+    p.add_argument('planes', nargs='+')
+    p.add_argument('--dataset', help='mostrar un dataset (o, con --catalogo, los planes que lo contienen)')
+    p.add_argument('--grupos', nargs='+', help='recorrer solo estos grupos')
+    p.add_argument('--catalogo', help='catálogo .sqlite (se actualiza con los planes dados)')
+    p.add_argument('--buscar', help="patrón GLOB sobre el catálogo, p. ej. '*Invert*'")
+    p.add_argument('--procesos', type=int)
+    p.set_defaults(funcion=comando_inspect)
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if args.perfil is None:
+        return args.funcion(args)
+    import instrumentacion
+    instrumentacion.activar(args.perfil)
+    with instrumentacion.etapa(args.comando):
+        return args.funcion(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+#extraccion del resumen de sedimentos (Results/Unsteady/Summary) de planes HEC-RAS
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from cache_planes import CachePlanes
+from hdf_plan import PlanHDF, RUTA_RESUMEN, mapear_planes
+from instrumentacion import medido
+
+COLUMNAS = [
+    'File', 'Mass In (tonnes)', 'Mass Out (tonnes)', 'Vol In (m³)', 'Vol Out (m³)',
+    'Trap Eff Mass (%)', 'Trap Eff Vol (%)'
+]
+
+# Campo del registro -> (texto que indica entrada/salida, tipo de magnitud)
+CAMPOS_RESUMEN = {
+    'mass_in': ('Cum In', 'Mass'),
+    'mass_out': ('Cum Out', 'Mass'),
+    'vol_in': ('Cum In', 'Vol'),
+    'vol_out': ('Cum Out', 'Vol'),
+}
+
+_UNIDAD_EN_CLAVE = re.compile(r'\(([^)]*)\)')
+
+
+@dataclass
+class ResumenSedimentos:
+    mass_in: float = None
+    mass_out: float = None
+    vol_in: float = None
+    vol_out: float = None
+    # {campo: unidad} de los cuatro campos anteriores
+    unidades: dict = field(default_factory=dict)
+    # Todas las cantidades numericas del resumen: {atributo: (valor, unidad)}
+    cantidades: dict = field(default_factory=dict)
+
+    @property
+    def te_mass(self):
+        return calcular_trap_eff(self.mass_in, self.mass_out, self.vol_in, self.vol_out)[0]
+
+    @property
+    def te_vol(self):
+        return calcular_trap_eff(self.mass_in, self.mass_out, self.vol_in, self.vol_out)[1]
+
+
+def calcular_trap_eff(mass_in, mass_out, vol_in, vol_out):
+    te_mass = (mass_in - mass_out) / mass_in * 100 if mass_in and mass_in > 0 else None
+    te_vol = (vol_in - vol_out) / vol_in * 100 if vol_in and vol_in > 0 else None
+    return te_mass, te_vol
+
+
+@lru_cache(maxsize=None)
+def _mapa_claves(version, claves):
+    # Disposición de los atributos del resumen para una versión de HEC-RAS:
+    # {campo: nombre del atributo}. Se resuelve una vez por disposición.
+    mapa = {}
+    for clave in claves:
+        for campo, (sentido, magnitud) in CAMPOS_RESUMEN.items():
+            if campo not in mapa and sentido in clave and magnitud in clave:
+                mapa[campo] = clave
+    return mapa
+
+
+def _parsear_valor(clave, raw):
+    # "1020.00 tonnes" -> (1020.0, 'tonnes'); la unidad puede venir en la clave
+    if isinstance(raw, bytes):
+        raw = raw.decode('utf-8', 'replace')
+    if not isinstance(raw, str):
+        try:
+            return float(raw), None
+        except (TypeError, ValueError):
+            return None, None
+
+    partes = raw.split(None, 1)
+    if not partes:
+        return None, None
+    try:
+        valor = float(partes[0])
+    except ValueError:
+        return None, None
+    if len(partes) > 1:
+        unidad = partes[1].strip()
+    else:
+        en_clave = _UNIDAD_EN_CLAVE.search(clave)
+        unidad = en_clave.group(1) if en_clave else None
+    return valor, unidad
+
+
+@medido('resumen.parsear')
+def parsear_resumen(attrs, version=''):
+    # Una sola pasada sobre los atributos (crudos de h5py o ya decodificados)
+    attrs = dict(attrs.items())
+    mapa = _mapa_claves(version, tuple(attrs))
+
+    resumen = ResumenSedimentos()
+    for clave, raw in attrs.items():
+        valor, unidad = _parsear_valor(clave, raw)
+        if valor is not None:
+            resumen.cantidades[clave] = (valor, unidad)
+    for campo, clave in mapa.items():
+        valor, unidad = resumen.cantidades.get(clave, (None, None))
+        setattr(resumen, campo, valor)
+        resumen.unidades[campo] = unidad
+    return resumen
+
+
+def fila_resumen(nombre, resumen):
+    # Fila de la tabla a partir de un ResumenSedimentos (None si no hay resumen)
+    result = dict.fromkeys(COLUMNAS)
+    result['File'] = nombre
+    if resumen is None:
+        return result
+
+    result['Mass In (tonnes)'] = resumen.mass_in
+    result['Mass Out (tonnes)'] = resumen.mass_out
+    result['Vol In (m³)'] = resumen.vol_in
+    result['Vol Out (m³)'] = resumen.vol_out
+    result['Trap Eff Mass (%)'] = resumen.te_mass
+    result['Trap Eff Vol (%)'] = resumen.te_vol
+    return result
+
+
+@medido('resumen.plan')
+def process_hdf_file(file_path):
+    nombre = os.path.basename(file_path)
+    try:
+        with PlanHDF(file_path) as plan:
+            if not plan.existe(RUTA_RESUMEN):
+                print(f"⚠️ Grupo '{RUTA_RESUMEN}' no encontrado en {file_path}")
+                return fila_resumen(nombre, None)
+            return fila_resumen(nombre, parsear_resumen(plan.resumen_attrs(), plan.version))
+    except Exception as e:
+        print(f"❌ Error en archivo {file_path}: {e}")
+        return fila_resumen(nombre, None)
+
+
+def procesar_planes(rutas, procesos=None, hilos=False, cache=None):
+    # Procesa los planes en paralelo y devuelve una tabla columnar (una fila
+    # por plan, en el mismo orden que rutas). Con cache (ruta de un .sqlite)
+    # los planes sin cambios se leen del cache sin abrir el HDF.
+    rutas = list(rutas)
+    if cache is None:
+        resultados = mapear_planes(process_hdf_file, rutas, procesos, hilos)
+    else:
+        with CachePlanes(cache) as c:
+            datos = c.obtener_varios(rutas, procesos, hilos)
+        resultados = []
+        for ruta, d in zip(rutas, datos):
+            resumen = None if d is None or d['resumen'] is None else parsear_resumen(d['resumen'])
+            resultados.append(fila_resumen(os.path.basename(ruta), resumen))
+    # pandas se importa recién aquí: leer el resumen de un plan no lo necesita
+    import pandas as pd
+    return pd.DataFrame(resultados, columns=COLUMNAS)
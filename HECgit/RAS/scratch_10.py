@@ -19,7 +19,8 @@ def recorrer_grupo(grupo, nivel=1):
         elif isinstance(item, h5py.Dataset):
             print(f"{indent}[DATASET] {key} - shape: {item.shape}, dtype: {item.dtype}")
 
-for file_path in hdf_files:
+
+def inspeccionar_grupos(file_path, group_paths):
     print(f"\n📁 Archivo: {file_path}")
     try:
         with h5py.File(file_path, 'r') as hdf:
@@ -41,3 +42,12 @@ for file_path in hdf_files:
                     print(f"  ❌ Grupo no encontrado: {group_path}")
     except Exception as e:
         print(f"  ⚠️ Error al leer el archivo {file_path}: {e}")
+
+
+def main():
+    for file_path in hdf_files:
+        inspeccionar_grupos(file_path, group_paths)
+
+
+if __name__ == '__main__':
+    main()
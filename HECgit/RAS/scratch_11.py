@@ -1,6 +1,6 @@
-import h5py
 import numpy as np
 import os
+from hdf_plan import PlanHDF
 
 def extraer_datos_sedimentos(hdf_path):
     if not os.path.exists(hdf_path):
@@ -8,7 +8,7 @@ def extraer_datos_sedimentos(hdf_path):
         return
 
     output = {}
-    with h5py.File(hdf_path, "r") as hdf:
+    with PlanHDF(hdf_path) as plan:
         print(f"📂 Abierto: {os.path.basename(hdf_path)}")
 
         # 1. Masa total de entrada según curva de carga de sedimentos
@@ -17,7 +17,7 @@ def extraer_datos_sedimentos(hdf_path):
                 "Sediment/Boundary Conditions/Sediment Rating Curve/"
                 "River: RioParana Reach: Embalse RS: 163200/Flow Load"
             )
-            flow_load = hdf[flow_load_path][()]
+            flow_load = plan.dataset(flow_load_path)[()]
             output["Masa total (kg) - Flow Load"] = float(np.sum(flow_load))
         except Exception as e:
             output["Flow Load error"] = str(e)
@@ -25,7 +25,7 @@ def extraer_datos_sedimentos(hdf_path):
         # 2. Datos observados (si están disponibles)
         try:
             obs_path = "Sediment/XS Parameters/Observed Data"
-            obs_data = hdf[obs_path][()]
+            obs_data = plan.dataset(obs_path)
             output["Datos observados - Shape"] = obs_data.shape
             output["Datos observados - Muestra"] = obs_data[:5].tolist()
         except Exception as e:
@@ -34,8 +34,8 @@ def extraer_datos_sedimentos(hdf_path):
         # 3. Gradación base del sedimento
         try:
             grad_path = "Sediment/Bed Gradation Data/Base Gradation"
-            grad = hdf[grad_path][()]
-            output["Base Gradation - Muestra"] = grad[:5].tolist()
+            grad = plan.dataset(grad_path)[:5]
+            output["Base Gradation - Muestra"] = grad.tolist()
         except Exception as e:
             output["Base Gradation error"] = str(e)
 
@@ -25,5 +25,9 @@ def explore_hecras_hdf(file_path):
         print(f"❌ Failed to read the file: {e}")
 
 
-# Run the function
-explore_hecras_hdf(file_path)
+def main():
+    explore_hecras_hdf(file_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+#analisis de sensibilidad a partir de los parametros guardados en cada plan HDF
+import os
+import re
+from fnmatch import fnmatchcase
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from hdf_plan import PlanHDF, decodificar, mapear_planes
+from resumen_plan import procesar_planes
+
+# Grupos del plan de donde se leen los parámetros (atributos y datasets
+# numéricos chicos). Además se recorre todo grupo fuera de Results cuyo
+# nombre contenga alguna de PALABRAS_SEDIMENTOS (condiciones de borde,
+# concentraciones y granulometría de los sedimentos).
+RUTAS_PARAMETROS = ('Plan Data/Plan Information', 'Plan Data/Plan Parameters')
+PALABRAS_SEDIMENTOS = ('Sediment',)
+MAX_VALORES = 256  # datasets más grandes no se consideran parámetros
+
+# Parámetros que se pueden haber variado en el análisis (patrones sobre el
+# nombre completo, 'grupo:atributo' o 'dataset[i].campo'). Otros campos que
+# cambien entre planes (títulos, fechas, la tabla Flow Load que repite la
+# concentración) no compiten por ser el parámetro variado. None = todos.
+PARAMETROS_CANDIDATOS = ('*:Concentration', '*.Clay', '*.VFM', '*.FM')
+
+# Salidas del resumen cuya sensibilidad se calcula
+SALIDAS = ('Trap Eff Mass (%)', 'Vol Out (m³)')
+
+# Número al inicio del texto seguido de espacio, '%' o fin ('99.67 mg/L', '40%');
+# no toma fechas como '01JAN2011'
+_NUMERO = re.compile(r'^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)(?=\s|%|$)')
+_PLAN = re.compile(r'\.p(\d+)', re.IGNORECASE)
+
+
+def numero_plan(ruta):
+    # 'Test.p35.hdf' -> 35, para ordenar los planes numéricamente (p9 < p35 < p100)
+    encontrado = _PLAN.search(os.path.basename(ruta))
+    return int(encontrado.group(1)) if encontrado else -1
+
+
+def _numero(valor):
+    # Valor numérico de un atributo ('99.67 mg/L', '40%', b'1.5', 3) o None
+    if isinstance(valor, (bytes, np.bytes_, str)):
+        encontrado = _NUMERO.match(decodificar(valor))
+        return float(encontrado.group(1)) if encontrado else None
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _agregar_dataset(parametros, nombre, dataset):
+    if dataset.size > MAX_VALORES:
+        return
+    datos = dataset[()]
+    campos = datos.dtype.names
+    if campos:
+        # Tabla compuesta: un parámetro por fila y columna
+        for campo in campos:
+            for i, valor in enumerate(np.atleast_1d(datos[campo]).ravel()):
+                numero = _numero(valor)
+                if numero is not None:
+                    parametros[f'{nombre}[{i}].{campo}'] = numero
+    else:
+        for indice, valor in np.ndenumerate(np.atleast_1d(datos)):
+            numero = _numero(valor)
+            if numero is not None:
+                parametros[f"{nombre}[{','.join(map(str, indice))}]"] = numero
+
+
+def _agregar_grupo(parametros, grupo):
+    for clave, valor in grupo.attrs.items():
+        if np.ndim(valor) == 0:
+            numero = _numero(valor)
+            if numero is not None:
+                parametros[f'{grupo.name.lstrip("/")}:{clave}'] = numero
+    for nombre, objeto in grupo.items():
+        if hasattr(objeto, 'dtype'):
+            _agregar_dataset(parametros, objeto.name.lstrip('/'), objeto)
+        else:
+            _agregar_grupo(parametros, objeto)
+
+
+def leer_parametros(ruta, rutas=RUTAS_PARAMETROS, palabras=PALABRAS_SEDIMENTOS):
+    # {nombre del parámetro: valor} de un plan ('grupo:atributo' o 'dataset[i]')
+    parametros = {}
+    with PlanHDF(ruta) as plan:
+        grupos = [plan.archivo[r] for r in rutas if plan.existe(r)]
+        sedimentos = []
+
+        def buscar(nombre, objeto):
+            if (not nombre.startswith('Results') and not hasattr(objeto, 'dtype')
+                    and any(p in nombre.rsplit('/', 1)[-1] for p in palabras)
+                    and not any(nombre.startswith(s + '/') for s in sedimentos)):
+                sedimentos.append(nombre)
+
+        plan.archivo.visititems(buscar)
+        grupos += [plan.archivo[s] for s in sedimentos if s not in rutas]
+        for grupo in grupos:
+            _agregar_grupo(parametros, grupo)
+    return parametros
+
+
+def matriz_parametros(parametros, candidatos=PARAMETROS_CANDIDATOS):
+    # Lista de dicts por plan -> DataFrame (planes x parámetros) solo con los
+    # parámetros candidatos que cambian entre planes
+    tabla = pd.DataFrame(parametros)
+    if tabla.empty:
+        return tabla
+    if candidatos is not None:
+        tabla = tabla.loc[:, [any(fnmatchcase(str(c), p) for p in candidatos) for c in tabla.columns]]
+    varian = tabla.nunique(dropna=True) > 1
+    return tabla.loc[:, varian]
+
+
+def valores_base(matriz):
+    # Valor base de cada parámetro: el más frecuente entre los planes (moda),
+    # ya que cada plan del análisis varía un solo parámetro
+    if matriz.shape[0] == 0 or matriz.shape[1] == 0:
+        return pd.Series(np.nan, index=matriz.columns)
+    return matriz.mode(dropna=True).iloc[0]
+
+
+def elegir_base(matriz, rutas):
+    # Plan base: la corrida sin perturbar, cuyos parámetros son todos iguales
+    # a la moda; entre varios, el de menor número de plan (orden numérico).
+    # Un plan perturbado nunca se toma como base.
+    moda = valores_base(matriz)
+    coinciden = ((matriz == moda) | (matriz.isna() & moda.isna())).all(axis=1).to_numpy()
+    if not coinciden.any():
+        raise ValueError("Ningún plan tiene todos los parámetros en su valor base (moda); "
+                         "indique el plan base sin perturbar (plan_base / --base)")
+    candidatos = np.flatnonzero(coinciden)
+    return int(candidatos[np.argmin([numero_plan(rutas[i]) for i in candidatos])])
+
+
+def _clave_ruta(ruta):
+    # Misma ruta aunque difieran separadores, mayúsculas (Windows) o sea relativa
+    return os.path.normcase(os.path.abspath(ruta))
+
+
+def _extraer_parametros(ruta, rutas, palabras):
+    try:
+        return leer_parametros(ruta, rutas, palabras)
+    except Exception as e:
+        print(f"❌ Error leyendo parámetros de {ruta}: {e}")
+        return {}
+
+
+def analizar_sensibilidad(rutas, salidas=SALIDAS, base=None, procesos=None, cache=None,
+                          rutas_parametros=RUTAS_PARAMETROS, palabras=PALABRAS_SEDIMENTOS,
+                          candidatos=PARAMETROS_CANDIDATOS):
+    # Lee parámetros y resúmenes de todos los planes en paralelo y calcula
+    # en una sola pasada vectorizada, respecto de los valores base X0 (moda
+    # de cada parámetro) y de las salidas Y0 del plan base (base o, si es
+    # None, el plan cuyos parámetros son todos la moda):
+    #   cambio relativo del parámetro   dX = (X - X0) / X0
+    #   cambio relativo de cada salida  dY = (Y - Y0) / Y0
+    #   elasticidad                     E  = dY / dX
+    # usando para cada plan el parámetro candidato con mayor |dX| (el que se
+    # varió). Los parámetros con valor base 0 no tienen cambio relativo y no
+    # se consideran.
+    # Devuelve (tabla por plan, tornado por parámetro, ruta del plan base).
+    # El plan base se agrega si no está entre las rutas; una misma ruta
+    # escrita de otra forma cuenta una sola vez
+    unicas = {}
+    for ruta in list(rutas) + ([base] if base is not None else []):
+        unicas.setdefault(_clave_ruta(ruta), ruta)
+    rutas = sorted(unicas.values(), key=numero_plan)
+    resumen = procesar_planes(rutas, procesos, cache=cache)
+    parametros = mapear_planes(partial(_extraer_parametros, rutas=rutas_parametros, palabras=palabras),
+                               rutas, procesos)
+    matriz = matriz_parametros(parametros, candidatos)
+    if base is not None:
+        i_base = [_clave_ruta(r) for r in rutas].index(_clave_ruta(base))
+        if not ((matriz.iloc[i_base] == valores_base(matriz)) | matriz.iloc[i_base].isna()).all():
+            print(f"⚠️ El plan base {os.path.basename(base)} tiene parámetros distintos de la moda")
+    else:
+        i_base = elegir_base(matriz, rutas)
+    if matriz.shape[1] == 0:
+        print("⚠️ No se encontraron parámetros que varíen entre los planes")
+        matriz = pd.DataFrame({None: np.full(len(rutas), np.nan)})
+    X = matriz.to_numpy(float)
+    X0 = valores_base(matriz).to_numpy(float)
+    Y = resumen[list(salidas)].to_numpy(float)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dX = np.where(X0 != 0, (X - X0) / X0, np.nan)
+        dY = (Y - Y[i_base]) / Y[i_base]
+        sin_cambio = np.all(np.isnan(dX) | (dX == 0), axis=1)
+        j = np.argmax(np.nan_to_num(np.abs(dX)), axis=1)
+        dX_plan = np.where(sin_cambio, np.nan, dX[np.arange(len(rutas)), j])
+        elasticidad = dY / dX_plan[:, None]
+
+    columnas = matriz.columns.to_numpy(dtype=object)
+    tabla = pd.DataFrame({
+        'Plan': [os.path.splitext(os.path.basename(r))[0] for r in rutas],
+        'Parámetro': np.where(sin_cambio, None, columnas[j]),
+        'Valor base': np.where(sin_cambio, np.nan, X0[j]),
+        'Nuevo valor': np.where(sin_cambio, np.nan, X[np.arange(len(rutas)), j]),
+        'Variación (%)': dX_plan * 100,
+    })
+    for k, salida in enumerate(salidas):
+        tabla[salida] = Y[:, k]
+        tabla[f'Cambio % {salida}'] = dY[:, k] * 100
+        tabla[f'Elasticidad {salida}'] = elasticidad[:, k]
+
+    # Tornado: rango de cambio de cada salida por parámetro, ordenado por el
+    # mayor |cambio| de la primera salida
+    variados = tabla.dropna(subset=['Parámetro'])
+    agregados = {}
+    for salida in salidas:
+        agregados[f'Mín cambio % {salida}'] = (f'Cambio % {salida}', 'min')
+        agregados[f'Máx cambio % {salida}'] = (f'Cambio % {salida}', 'max')
+        agregados[f'Elasticidad media {salida}'] = (f'Elasticidad {salida}', 'mean')
+    if len(variados):
+        tornado = variados.groupby('Parámetro').agg(**agregados)
+    else:
+        tornado = pd.DataFrame(columns=list(agregados), dtype=float)
+    primera = salidas[0]
+    orden = np.maximum(tornado[f'Mín cambio % {primera}'].abs(), tornado[f'Máx cambio % {primera}'].abs())
+    tornado = tornado.loc[orden.sort_values(ascending=False).index]
+    return tabla, tornado, rutas[i_base]
+
+
+def etiqueta_parametro(nombre):
+    # Nombre corto para tablas y gráficos: 'Rating Curve 1000:Concentration', 'Bed Gradation[0].Clay'
+    return nombre.rsplit('/', 1)[-1] if isinstance(nombre, str) else nombre
@@ -0,0 +1,60 @@
+#regresion de cambio_volumen con secciones de densidad de puntos desigual
+import os
+import sys
+
+import h5py
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batimetria import AlmacenBatimetria  # noqa: E402
+from volumenes_batimetria import cambio_volumen  # noqa: E402
+
+ANCHO = 100.0
+DEPOSITO = 2.0  # m sobre la mitad izquierda de cada sección en el segundo año
+
+
+def _estes(denso_izquierda):
+    # Puntos de 0 a ANCHO m, densos sobre una margen: el centroide queda lejos
+    # del centro y las estaciones de las secciones se corren en sentidos opuestos
+    if denso_izquierda:
+        return np.concatenate([np.linspace(0.0, 20.0, 81), [50.0, 50.5, 75.0, ANCHO]])
+    return np.concatenate([[0.0, 25.0, 50.0, 50.5], np.linspace(ANCHO - 20.0, ANCHO, 81)])
+
+
+def _crear_almacen(ruta):
+    perfiles = ['P1', 'P2']
+    secciones = [(_estes(True), 0.0), (_estes(False), -500.0)]
+    with h5py.File(ruta, 'w') as archivo:
+        archivo.create_dataset('perfiles', data=np.array(perfiles, dtype=h5py.string_dtype()))
+        for anio, deposito in (('2000', 0.0), ('2010', DEPOSITO)):
+            codigos = np.concatenate([np.full(len(e), i) for i, (e, _) in enumerate(secciones)])
+            este = np.concatenate([e for e, _ in secciones])
+            norte = np.concatenate([np.full(len(e), n) for e, n in secciones])
+            cota = 100.0 + np.where(este <= 50.0, deposito, 0.0)
+            grupo = archivo.create_group(anio)
+            grupo.create_dataset('Perfil', data=codigos.astype(np.int32))
+            for columna, valores in (('Este', este), ('Norte', norte - norte.min()), ('Cota', cota)):
+                grupo.create_dataset(columna, data=valores.astype(np.float32)).attrs['origen'] = 0.0
+
+
+def _area_por_seccion(almacen, perfil, n_estaciones):
+    # Referencia: cada sección remuestreada por separado sobre su propia grilla
+    a, b = almacen.perfil('2000', perfil), almacen.perfil('2010', perfil)
+    grilla = np.linspace(0.0, ANCHO, n_estaciones)
+    dz = np.interp(grilla, b['Este'], b['Cota']) - np.interp(grilla, a['Este'], a['Cota'])
+    deposito = np.clip(dz, 0, None)
+    return float(((deposito[1:] + deposito[:-1]) * np.diff(grilla)).sum() / 2)
+
+
+def test_secciones_con_puntos_densos_en_margenes_opuestas(tmp_path):
+    ruta = str(tmp_path / 'batimetria.h5')
+    _crear_almacen(ruta)
+    with AlmacenBatimetria(ruta) as almacen:
+        tabla, resumen = cambio_volumen(almacen, '2000', '2010', n_estaciones=201)
+        areas = tabla.set_index('Perfil')['Área depósito (m²)']
+        for perfil in ('P1', 'P2'):
+            assert areas[perfil] == pytest.approx(_area_por_seccion(almacen, perfil, 201), rel=1e-6)
+            assert areas[perfil] == pytest.approx(DEPOSITO * ANCHO / 2, abs=1.0)
+    assert resumen['Erosión (m³)'] == pytest.approx(0.0)
@@ -0,0 +1,173 @@
+#volumen depositado/erosionado entre levantamientos batimetricos por interpolacion de secciones
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from batimetria import AlmacenBatimetria
+
+# Columna de volumen por tramo -> columna de área de la que se integra
+VOLUMENES = {
+    'Volumen depósito (m³)': 'Área depósito (m²)',
+    'Volumen erosión (m³)': 'Área erosión (m²)',
+    'Volumen neto (m³)': 'Área neta (m²)',
+}
+
+
+def _puntos(datos):
+    # (código de Perfil, Este, Norte, Cota) de los puntos con Perfil
+    codigos = datos['Perfil'].cat.codes.to_numpy()
+    con_perfil = codigos >= 0
+    return (codigos[con_perfil], datos['Este'].to_numpy(float)[con_perfil],
+            datos['Norte'].to_numpy(float)[con_perfil], datos['Cota'].to_numpy(float)[con_perfil])
+
+
+def ejes_perfiles(codigos, este, norte, n_perfiles):
+    # Eje de cada Perfil (recta de ajuste de sus puntos en planta, por
+    # componentes principales) como origen (x0, y0) y dirección (cos, sen),
+    # orientada hacia Este creciente. Vectorizado con bincount.
+    cantidad = np.bincount(codigos, minlength=n_perfiles).astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x0 = np.bincount(codigos, este, n_perfiles) / cantidad
+        y0 = np.bincount(codigos, norte, n_perfiles) / cantidad
+        dx, dy = este - x0[codigos], norte - y0[codigos]
+        sxx = np.bincount(codigos, dx * dx, n_perfiles)
+        syy = np.bincount(codigos, dy * dy, n_perfiles)
+        sxy = np.bincount(codigos, dx * dy, n_perfiles)
+    angulo = 0.5 * np.arctan2(2 * sxy, sxx - syy)
+    cos, sen = np.cos(angulo), np.sin(angulo)
+    invertir = cos < 0
+    cos[invertir], sen[invertir] = -cos[invertir], -sen[invertir]
+    return x0, y0, cos, sen
+
+
+def _ordenar(codigos, estacion, cota, n_perfiles):
+    # Orden por (Perfil, estación) y extremos de estación de cada Perfil
+    orden = np.lexsort((estacion, codigos))
+    codigos, estacion, cota = codigos[orden], estacion[orden], cota[orden]
+    rangos = np.searchsorted(codigos, np.arange(n_perfiles + 1))
+    hay = rangos[1:] > rangos[:-1]
+    minimo = np.full(n_perfiles, np.nan)
+    maximo = np.full(n_perfiles, np.nan)
+    minimo[hay] = estacion[rangos[:-1][hay]]
+    maximo[hay] = estacion[rangos[1:][hay] - 1]
+    return codigos, estacion, cota, minimo, maximo
+
+
+def cambio_volumen(almacen, anio_a, anio_b, n_estaciones=200):
+    # Remuestrea cada Perfil común a los dos años sobre una grilla de
+    # n_estaciones en el tramo de estaciones que cubren ambos, calcula el
+    # área de depósito y erosión de cada sección y la integra a lo largo de
+    # la distancia entre talwegs (áreas medias). Cota mayor en anio_b = depósito.
+    # Devuelve (tabla por sección, resumen).
+    n_perfiles = len(almacen.perfiles)
+    ca, xa, ya, za = _puntos(almacen.datos(anio_a))
+    cb, xb, yb, zb = _puntos(almacen.datos(anio_b))
+
+    # Mismo eje por Perfil para los dos años
+    x0, y0, cos, sen = ejes_perfiles(np.concatenate([ca, cb]), np.concatenate([xa, xb]),
+                                     np.concatenate([ya, yb]), n_perfiles)
+    sa = (xa - x0[ca]) * cos[ca] + (ya - y0[ca]) * sen[ca]
+    sb = (xb - x0[cb]) * cos[cb] + (yb - y0[cb]) * sen[cb]
+    ca, sa, za, min_a, max_a = _ordenar(ca, sa, za, n_perfiles)
+    cb, sb, zb, min_b, max_b = _ordenar(cb, sb, zb, n_perfiles)
+
+    desde = np.fmax(min_a, min_b)
+    hasta = np.fmin(max_a, max_b)
+    comunes = np.flatnonzero(hasta > desde)
+
+    # Grilla común (secciones x estaciones). Cada sección se desplaza en un
+    # tramo propio del eje, así una sola llamada a np.interp remuestrea todas:
+    # la sección k empieza (su menor estación) donde termina la anterior más
+    # 1 m. Las estaciones se miden desde el centroide de los puntos, que no
+    # es el centro del ancho, por eso el tramo depende del ancho de cada una.
+    inicio = np.fmin(min_a, min_b)[comunes]
+    ancho = np.fmax(max_a, max_b)[comunes] - inicio
+    desplazamiento = np.zeros(n_perfiles)
+    desplazamiento[comunes] = np.concatenate([[0.0], np.cumsum(ancho + 1.0)[:-1]]) - inicio
+    fuera_a = np.isin(ca, comunes, invert=True)
+    fuera_b = np.isin(cb, comunes, invert=True)
+    clave_a = (sa + desplazamiento[ca])[~fuera_a]
+    clave_b = (sb + desplazamiento[cb])[~fuera_b]
+
+    t = np.linspace(0.0, 1.0, n_estaciones)
+    grilla = desde[comunes, None] + t * (hasta - desde)[comunes, None]
+    clave_grilla = grilla + desplazamiento[comunes, None]
+    cota_a = np.interp(clave_grilla, clave_a, za[~fuera_a])
+    cota_b = np.interp(clave_grilla, clave_b, zb[~fuera_b])
+
+    # Áreas por trapecios sobre la grilla
+    dz = cota_b - cota_a
+    ds = (hasta - desde)[comunes] / (n_estaciones - 1)
+
+    def area(valores):
+        return (valores[:, 1:] + valores[:, :-1]).sum(axis=1) * ds / 2
+
+    deposito = area(np.clip(dz, 0, None))
+    erosion = area(np.clip(-dz, 0, None))
+
+    tabla = pd.DataFrame({
+        'Perfil': np.asarray(almacen.perfiles, dtype=object)[comunes],
+        'Ancho común (m)': (hasta - desde)[comunes],
+        'Área depósito (m²)': deposito,
+        'Área erosión (m²)': erosion,
+        'Área neta (m²)': deposito - erosion,
+    })
+
+    # Orden y distancias a lo largo del talweg del primer año
+    talweg = almacen.talweg(anio_a)
+    talweg = talweg[talweg['Perfil'].isin(tabla['Perfil'])]
+    tabla = tabla.set_index('Perfil').loc[talweg['Perfil'].astype(str)].reset_index()
+    xy = talweg[['Este', 'Norte']].to_numpy(float)
+    distancia = np.hypot(*np.diff(xy, axis=0).T)
+    tabla['Distancia talweg (m)'] = np.concatenate([[0.0], np.cumsum(distancia)])
+
+    # Volumen de cada tramo entre una sección y la siguiente (áreas medias)
+    for columna_volumen, columna_area in VOLUMENES.items():
+        a = tabla[columna_area].to_numpy()
+        tabla[columna_volumen] = np.append((a[1:] + a[:-1]) / 2 * distancia, 0.0)
+
+    resumen = {
+        'Año inicial': anio_a,
+        'Año final': anio_b,
+        'Secciones': len(tabla),
+        'Depósito (m³)': float(tabla['Volumen depósito (m³)'].sum()),
+        'Erosión (m³)': float(tabla['Volumen erosión (m³)'].sum()),
+        'Cambio neto (m³)': float(tabla['Volumen neto (m³)'].sum()),
+    }
+    return tabla, resumen
+
+
+# Almacén abierto por cada proceso del pool
+_almacen_worker = None
+
+
+def _iniciar_worker(ruta_almacen):
+    global _almacen_worker
+    _almacen_worker = AlmacenBatimetria(ruta_almacen)
+
+
+def _cambio_par(par, n_estaciones):
+    return cambio_volumen(_almacen_worker, par[0], par[1], n_estaciones)
+
+
+def cambios_volumen(ruta_almacen, pares=None, n_estaciones=200, procesos=None):
+    # cambio_volumen para varios pares de años en paralelo (por defecto
+    # todos los pares). Devuelve (tabla resumen con una fila por par,
+    # {(anio_a, anio_b): tabla por sección}).
+    if pares is None:
+        with AlmacenBatimetria(ruta_almacen) as almacen:
+            pares = list(combinations(almacen.anios, 2))
+    pares = [(str(a), str(b)) for a, b in pares]
+
+    if procesos == 1 or len(pares) <= 1:
+        with AlmacenBatimetria(ruta_almacen) as almacen:
+            resultados = [cambio_volumen(almacen, a, b, n_estaciones) for a, b in pares]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_worker,
+                                 initargs=(ruta_almacen,)) as pool:
+            resultados = list(pool.map(_cambio_par, pares, [n_estaciones] * len(pares)))
+
+    resumen = pd.DataFrame([r for _, r in resultados])
+    return resumen, {par: tabla for par, (tabla, _) in zip(pares, resultados)}